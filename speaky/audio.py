@@ -2,16 +2,59 @@
 
 from __future__ import annotations
 
+import os
 import time
 from pathlib import Path
 
 import vlc
 
+from .priority import PlaybackClaim, PREEMPT_DUCK, PREEMPT_STOP, DUCK_VOLUME
+
+# Set to "null" to read audio files without playing them, for load tests
+# and machines without libVLC
+AUDIO_SINK_ENV = "SPEAKY_AUDIO_SINK"
+
+
+def _null_sink() -> bool:
+    return os.environ.get(AUDIO_SINK_ENV) == "null"
+
+
+def create_vlc_instance() -> vlc.Instance | None:
+    """Initialize libVLC ahead of playback.
+
+    Loading libVLC and its plugins is the slow part of starting playback,
+    so callers can do it while other work is in progress and pass the
+    instance to ``play_audio_file``. Returns None with the null audio sink.
+    """
+    if _null_sink():
+        return None
+    instance = vlc.Instance()
+    if instance is None:
+        raise RuntimeError("Failed to initialize VLC")
+    return instance
+
+
+def play_audio_file(
+    file_path: str | Path,
+    instance: vlc.Instance | None = None,
+    claim: PlaybackClaim | None = None,
+    preempt_mode: str = PREEMPT_STOP,
+) -> None:
+    """Play audio file using VLC.
+
+    With a ``claim``, playback yields to higher-priority messages from other
+    processes: it stops, or with ``preempt_mode="duck"`` plays on at a lower
+    volume until they are done.
+    """
+    if _null_sink():
+        Path(file_path).read_bytes()
+        return
 
-def play_audio_file(file_path: str | Path) -> None:
-    """Play audio file using VLC."""
     try:
-        player = vlc.MediaPlayer(str(file_path))
+        if instance is not None:
+            player = instance.media_player_new(str(file_path))
+        else:
+            player = vlc.MediaPlayer(str(file_path))
         if player is None:
             raise RuntimeError("Failed to initialize VLC media player")
         player.play()
@@ -20,11 +63,22 @@ def play_audio_file(file_path: str | Path) -> None:
         time.sleep(0.5)
 
         # Wait for playback to finish
+        ducked = False
         while player.get_state() in [
             vlc.State.Playing,  # type: ignore
             vlc.State.Opening,  # type: ignore
             vlc.State.Buffering,  # type: ignore
         ]:
+            if claim is not None:
+                if claim.outranked():
+                    if preempt_mode != PREEMPT_DUCK:
+                        break
+                    if not ducked:
+                        player.audio_set_volume(DUCK_VOLUME)
+                        ducked = True
+                elif ducked:
+                    player.audio_set_volume(100)
+                    ducked = False
             time.sleep(0.1)
 
         player.stop()
@@ -33,3 +87,16 @@ def play_audio_file(file_path: str | Path) -> None:
         print(f"❌ Error playing audio: {e}")
         print("Make sure VLC is installed on your system.")
         raise
+
+
+def speak_locally(text: str) -> None:
+    """Speak text with the offline pyttsx3 engine.
+
+    Used as a fallback when the TTS API is unavailable; the voice is the
+    operating system's, not the configured OpenAI voice.
+    """
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    engine.say(text)
+    engine.runAndWait()
@@ -0,0 +1,42 @@
+"""Detached background work for Speaky."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from .config import get_cache_dir
+
+LOG_FILE_NAME = "speaky.log"
+
+
+def get_log_file() -> Path:
+    """Get path of the log file that detached processes write to."""
+    return get_cache_dir() / LOG_FILE_NAME
+
+
+def spawn_detached(args: list[str]) -> subprocess.Popen:
+    """Run ``speaky <args>`` in a child process that outlives the caller.
+
+    The child gets its own session (or process group on Windows) so it is
+    not killed with the parent's terminal, and its output is appended to
+    the log file in the cache directory.
+    """
+    kwargs: dict = {}
+    if sys.platform == "win32":
+        kwargs["creationflags"] = (
+            subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        )
+    else:
+        kwargs["start_new_session"] = True
+
+    with open(get_log_file(), "ab") as log:
+        return subprocess.Popen(
+            [sys.executable, "-m", "speaky.main", *args],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            close_fds=True,
+            **kwargs,
+        )
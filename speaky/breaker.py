@@ -0,0 +1,132 @@
+"""Circuit breaker for the TTS API, shared by every Speaky process.
+
+The breaker state lives in a small file in the cache directory. After
+``breaker_threshold`` consecutive connection failures or server errors the
+circuit opens: for ``breaker_cooldown`` seconds, cache misses fail
+immediately instead of each process waiting out its own connection
+attempt. After the cooldown a single process is let through as a probe;
+its success closes the circuit and its failure re-opens it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import openai
+
+from .config import get_cache_dir
+
+BREAKER_FILE_NAME = "breaker.json"
+PROBE_FILE_NAME = "breaker.probe"
+
+FAILURE_THRESHOLD = 3
+COOLDOWN_SECONDS = 60.0
+# A probe that has not reported back within this time is assumed dead
+PROBE_TIMEOUT = 30.0
+
+# Errors that indicate the API is down or unreachable, rather than a
+# problem with the request itself
+OUTAGE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the API while the circuit is open."""
+
+
+def _valid_state(state) -> bool:
+    if not isinstance(state, dict):
+        return False
+    failures, opened_at = state.get("failures"), state.get("opened_at")
+    if isinstance(failures, bool) or not isinstance(failures, int) or failures < 0:
+        return False
+    return opened_at is None or (
+        isinstance(opened_at, (int, float)) and not isinstance(opened_at, bool)
+    )
+
+
+def _load_state() -> dict:
+    try:
+        state = json.loads((get_cache_dir() / BREAKER_FILE_NAME).read_text())
+    except (OSError, ValueError):
+        state = None
+    if not _valid_state(state):
+        return {"failures": 0, "opened_at": None}
+    return state
+
+
+def _save_state(state: dict) -> None:
+    breaker_file = get_cache_dir() / BREAKER_FILE_NAME
+    tmp_file = breaker_file.with_name(f"{breaker_file.name}.{os.getpid()}.tmp")
+    tmp_file.write_text(json.dumps(state))
+    os.replace(tmp_file, breaker_file)
+
+
+def _claim_probe() -> bool:
+    """Atomically claim the single half-open probe; return True if we got it."""
+    probe_file = get_cache_dir() / PROBE_FILE_NAME
+    for _ in range(2):
+        try:
+            os.close(os.open(probe_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                age = time.time() - probe_file.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < PROBE_TIMEOUT:
+                return False
+            probe_file.unlink(missing_ok=True)
+    return False
+
+
+def release_probe() -> None:
+    """Give up the half-open probe, letting the next process check the API."""
+    (get_cache_dir() / PROBE_FILE_NAME).unlink(missing_ok=True)
+
+
+def before_request(config: dict) -> bool:
+    """Check the circuit before calling the API.
+
+    Raises ``CircuitOpenError`` while the circuit is open, or while another
+    process is probing the API after the cooldown. Returns True if this
+    request is the probe, which the caller must release with
+    ``release_probe`` however the request ends.
+    """
+    state = _load_state()
+    if state["failures"] < config.get("breaker_threshold", FAILURE_THRESHOLD):
+        return False
+
+    if state["opened_at"] is None:
+        # The failures were counted under a higher threshold, so the
+        # circuit has only just opened under the current one
+        state["opened_at"] = time.time()
+        _save_state(state)
+
+    remaining = state["opened_at"] + config.get("breaker_cooldown", COOLDOWN_SECONDS) - time.time()
+    if remaining > 0:
+        raise CircuitOpenError(
+            f"TTS API unavailable after {state['failures']} consecutive failures; "
+            f"retrying in {remaining:.0f}s"
+        )
+    if not _claim_probe():
+        raise CircuitOpenError("TTS API unavailable; another process is checking it")
+    return True
+
+
+def record_success() -> None:
+    """Close the circuit after a successful API call."""
+    if _load_state()["failures"]:
+        _save_state({"failures": 0, "opened_at": None})
+    release_probe()
+
+
+def record_failure(config: dict) -> None:
+    """Count a failed API call, opening the circuit at the threshold."""
+    state = _load_state()
+    state["failures"] += 1
+    if state["failures"] >= config.get("breaker_threshold", FAILURE_THRESHOLD):
+        state["opened_at"] = time.time()
+    _save_state(state)
+    release_probe()
@@ -4,6 +4,14 @@ import hashlib
 from pathlib import Path
 from .config import get_cache_dir
 
+# Audio formats the OpenAI TTS API can return; each is cached under its
+# own file extension
+AUDIO_FORMATS = ("mp3", "opus", "aac", "flac", "wav", "pcm")
+
+# Format that MP3 entries are transcoded to by the compact storage tier
+# (see ``speaky.transcode``)
+COMPACT_FORMAT = "opus"
+
 
 def generate_cache_key(text: str, voice: str, instructions: str) -> str:
     """Generate MD5 hash for cache key."""
@@ -11,16 +19,33 @@ def generate_cache_key(text: str, voice: str, instructions: str) -> str:
     return hashlib.md5(cache_string.encode()).hexdigest()
 
 
-def get_cache_file(text: str, voice: str, instructions: str) -> Path:
-    """Get cache file path for given parameters."""
+def get_cache_file(
+    text: str,
+    voice: str,
+    instructions: str,
+    response_format: str = "mp3",
+    exact: bool = False,
+) -> Path:
+    """Get cache file path for given parameters.
+
+    If an MP3 entry has been compacted, the compact entry is returned
+    instead, unless ``exact`` is set because the caller needs the bytes in
+    ``response_format`` rather than any playable audio.
+    """
     cache_key = generate_cache_key(text, voice, instructions)
     cache_dir = get_cache_dir()
-    return cache_dir / f"{cache_key}.mp3"
+    cache_file = cache_dir / f"{cache_key}.{response_format}"
+    if response_format == "mp3" and not exact and not cache_file.exists():
+        compact_file = cache_file.with_suffix(f".{COMPACT_FORMAT}")
+        if compact_file.exists():
+            return compact_file
+    return cache_file
 
 
 def clear_cache():
     """Clear all cached audio files."""
     cache_dir = get_cache_dir()
-    for cache_file in cache_dir.glob("*.mp3"):
-        cache_file.unlink()
-    print(f"✅ Cleared cache directory: {cache_dir}")
\ No newline at end of file
+    for response_format in AUDIO_FORMATS:
+        for cache_file in cache_dir.glob(f"*.{response_format}"):
+            cache_file.unlink()
+    print(f"✅ Cleared cache directory: {cache_dir}")
@@ -0,0 +1,124 @@
+"""Shorten noisy notification text before it is synthesized.
+
+Hook and build messages are full of file paths, commit hashes, URLs and
+repeated log lines that take a long time to listen to and are billed per
+character. With ``compaction`` enabled in the config, each step below
+rewrites the text before it reaches the API (and the cache key):
+
+- ``paths``: file paths are shortened to their basename
+- ``hashes``: hex hashes and UUIDs are dropped
+- ``urls``: URLs are dropped
+- ``repeats``: runs of identical lines collapse into one
+- ``max_chars``: the result is cut to a character budget, preferably at
+  the end of a sentence
+
+``"compaction": true`` enables every step with the defaults; a dict
+overrides individual steps, e.g. ``{"urls": false, "max_chars": 500}``.
+"""
+
+from __future__ import annotations
+
+import re
+
+DEFAULT_COMPACTION = {
+    "paths": True,
+    "hashes": True,
+    "urls": True,
+    "repeats": True,
+    "max_chars": 300,
+}
+
+# Trailing sentence punctuation is left in place, so sentence breaks survive
+URL = re.compile(
+    r"\b(?:[a-z][a-z0-9+.-]*://|www\.)\S+?(?=[.,;:!?)\]\"']*(?:\s|$))", re.IGNORECASE
+)
+UUID = re.compile(
+    r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE
+)
+# At least seven hex digits including both a digit and a letter, so words
+# like "defaced" and numbers like counts, dates and timestamps survive; a
+# run after "." is the fraction of a decimal number
+HEX_HASH = re.compile(
+    r"(?<![\w.])(?=[0-9a-f]*\d)(?=[0-9a-f]*[a-f])[0-9a-f]{7,64}\b", re.IGNORECASE
+)
+# Absolute, home-relative and dot-relative paths
+ROOTED_PATH = re.compile(r"(?<![\w/.~])(?:~|\.{1,2})?/(?:[\w.@+-]+/)*([\w.@+-]+)")
+# Relative paths are only recognized with a file extension, so "and/or" survives
+RELATIVE_PATH = re.compile(r"(?<![\w/.])(?:[\w.@+-]+/)+([\w@+-]+\.[a-z]\w*)\b", re.IGNORECASE)
+WINDOWS_PATH = re.compile(r"\b[a-z]:\\(?:[\w.@+ -]+\\)*([\w.@+-]+)", re.IGNORECASE)
+
+SENTENCE_CUT = re.compile(r"[.!?][\"')\]]*(?=\s)")
+CLAUSE_CUT = re.compile(r"[,;:](?=\s)")
+
+
+def compaction_settings(config: dict) -> dict | None:
+    """Return the compaction steps enabled in ``config``, or None if off."""
+    setting = config.get("compaction")
+    if not setting:
+        return None
+    if setting is True:
+        return dict(DEFAULT_COMPACTION)
+    if not isinstance(setting, dict):
+        raise ValueError("compaction must be true, false or an object")
+    unknown = set(setting) - set(DEFAULT_COMPACTION)
+    if unknown:
+        raise ValueError(f"Unknown compaction option(s): {', '.join(sorted(unknown))}")
+    return {**DEFAULT_COMPACTION, **setting}
+
+
+def collapse_repeats(text: str) -> str:
+    """Collapse runs of identical lines into a single line."""
+    lines = []
+    for line in text.splitlines():
+        if not lines or line.strip() != lines[-1].strip():
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def cut_to_budget(text: str, max_chars: int) -> str:
+    """Cut ``text`` to at most ``max_chars``.
+
+    The cut goes after the last complete sentence if that keeps at least
+    half the budget, else after the last clause, else at a word boundary.
+    """
+    if len(text) <= max_chars:
+        return text
+    window = text[: max_chars + 1]
+    for pattern in (SENTENCE_CUT, CLAUSE_CUT):
+        ends = [match.end() for match in pattern.finditer(window)]
+        ends = [end for end in ends if max_chars // 2 <= end <= max_chars]
+        if ends:
+            return text[: ends[-1]].rstrip(",;:")
+    cut = window.rfind(" ")
+    return text[: cut if cut > 0 else max_chars].rstrip()
+
+
+def compact_text(text: str, config: dict) -> str:
+    """Apply the compaction steps enabled in ``config`` to ``text``."""
+    settings = compaction_settings(config)
+    if settings is None:
+        return text
+
+    compacted = text
+    if settings["urls"]:
+        compacted = URL.sub("", compacted)
+    if settings["paths"]:
+        for pattern in (WINDOWS_PATH, ROOTED_PATH, RELATIVE_PATH):
+            compacted = pattern.sub(r"\1", compacted)
+    if settings["hashes"]:
+        compacted = HEX_HASH.sub("", UUID.sub("", compacted))
+    if settings["repeats"]:
+        compacted = collapse_repeats(compacted)
+
+    # Tidy the gaps left by removed tokens
+    compacted = re.sub(r"[ \t]+", " ", compacted)
+    compacted = re.sub(r"\(\s*\)|\[\s*\]|\"\s*\"|'\s*'", "", compacted)
+    compacted = re.sub(r" ([,.;:!?)])", r"\1", compacted)
+    compacted = " ".join(compacted.split())
+
+    # A message that was nothing but noise is still better read than skipped
+    if not compacted:
+        compacted = " ".join(text.split())
+    if settings["max_chars"]:
+        compacted = cut_to_budget(compacted, settings["max_chars"])
+    return compacted
@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 import platformdirs
 
 USER_CONFIG_PATH = Path.home() / ".speaky.json"
+SNAPSHOT_FILE_NAME = "config-snapshot.json"
 
 DEFAULT_CONFIG = {
     "model": "gpt-4o-mini-tts",
@@ -15,6 +16,13 @@ DEFAULT_CONFIG = {
     "response_format": "mp3",
 }
 
+# Environment variables that override a config key for one invocation
+ENV_OVERRIDES = {
+    "SPEAKY_VOICE": "voice",
+    "SPEAKY_MODEL": "model",
+    "SPEAKY_RESPONSE_FORMAT": "response_format",
+}
+
 
 def get_cache_dir() -> Path:
     """Get platform-appropriate cache directory."""
@@ -29,24 +37,121 @@ def install_default_config():
         USER_CONFIG_PATH.write_text(json.dumps(DEFAULT_CONFIG, indent=2) + "\n")
 
 
-def load_config():
-    """Load configuration from ~/.speaky.json with defaults, plus env vars."""
-    api_key = os.environ.get("OPENAI_API_KEY")
+def _stat_key(path: Path):
+    """Return what identifies a version of ``path``, or None if it is missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _load_snapshot() -> dict:
+    try:
+        return json.loads((get_cache_dir() / SNAPSHOT_FILE_NAME).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_snapshot(snapshot: dict) -> None:
+    snapshot_file = get_cache_dir() / SNAPSHOT_FILE_NAME
+    tmp_file = snapshot_file.with_name(f"{snapshot_file.name}.{os.getpid()}.tmp")
+    try:
+        tmp_file.write_text(json.dumps(snapshot))
+        os.replace(tmp_file, snapshot_file)
+    except OSError:
+        # The snapshot is only a shortcut; the next run rebuilds it
+        tmp_file.unlink(missing_ok=True)
+
+
+def _read_user_config(snapshot: dict) -> dict:
+    """Return the merged config, from the snapshot if the file is unchanged."""
+    source = [str(USER_CONFIG_PATH), _stat_key(USER_CONFIG_PATH)]
+    if source[1] is not None and snapshot.get("config_source") == source:
+        return snapshot["config"]
+
+    if source[1] is None:
+        try:
+            install_default_config()
+        except OSError:
+            pass
+        source[1] = _stat_key(USER_CONFIG_PATH)
+
+    config = dict(DEFAULT_CONFIG)
+    if source[1] is not None:
+        config.update(json.loads(USER_CONFIG_PATH.read_text()))
+    snapshot["config_source"] = source
+    snapshot["config"] = config
+    return config
+
 
+def _find_dotenv(snapshot: dict) -> Path | None:
+    """Find the nearest ``.env`` from the working directory upwards.
+
+    The directories searched are recorded with their mtimes, which change
+    whenever a file is added to or removed from them, so a later run with
+    the same working directory can reuse the result with one stat each.
+    """
+    start = os.getcwd()
+    cached = snapshot.get("dotenv")
+    if cached and cached["start"] == start and all(
+        _stat_key(Path(directory)) == key for directory, key in cached["dirs"].items()
+    ):
+        return Path(cached["path"]) if cached["path"] else None
+
+    found = None
+    dirs = {}
+    directory = Path(start)
+    for directory in (directory, *directory.parents):
+        dirs[str(directory)] = _stat_key(directory)
+        if (directory / ".env").is_file():
+            found = directory / ".env"
+            break
+    snapshot["dotenv"] = {
+        "start": start,
+        "path": str(found) if found else None,
+        "dirs": dirs,
+    }
+    return found
+
+
+def active_overrides() -> dict:
+    """Return the config values overridden by environment variables."""
+    return {key: os.environ[variable] for variable, key in ENV_OVERRIDES.items() if os.environ.get(variable)}
+
+
+def load_config(overrides: bool = True):
+    """Load configuration from ~/.speaky.json with defaults, plus env vars.
+
+    The parsed config file and the location of the nearest ``.env`` are
+    kept in a snapshot in the cache directory and reused while the files
+    behind them are unchanged. Secrets are never stored in the snapshot.
+    With ``overrides`` false, ``ENV_OVERRIDES`` are ignored and the config
+    is the one in the file.
+    """
+    snapshot = _load_snapshot()
+    original = json.dumps(snapshot, sort_keys=True)
+
+    config = dict(_read_user_config(snapshot))
+
+    api_key = os.environ.get("OPENAI_API_KEY")
     if not api_key:
-        load_dotenv()
-        api_key = os.getenv("OPENAI_API_KEY")
+        dotenv_path = _find_dotenv(snapshot)
+        if dotenv_path is not None:
+            load_dotenv(dotenv_path)
+            api_key = os.getenv("OPENAI_API_KEY")
+
+    if json.dumps(snapshot, sort_keys=True) != original:
+        _save_snapshot(snapshot)
+
     if not api_key:
         raise ValueError(
             "OPENAI_API_KEY not found in environment variables. "
             "Please add your OpenAI API key to .env file or environment variables."
         )
 
-    config = dict(DEFAULT_CONFIG)
-
-    if USER_CONFIG_PATH.exists():
-        user_config = json.loads(USER_CONFIG_PATH.read_text())
-        config.update(user_config)
+    if overrides:
+        config.update(active_overrides())
 
     config["api_key"] = api_key
     return config
@@ -0,0 +1,204 @@
+"""Phrase history and background cache re-warming.
+
+Changing ``voice`` or ``instructions`` invalidates every cache key. To keep
+the hit rate up, Speaky remembers how often and how recently each phrase
+was spoken, and re-synthesizes the most valuable phrases in the background
+when the voice settings change.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .cache import get_cache_file
+from .config import get_cache_dir
+from .scheduler import BACKGROUND
+from .timescale import generate_time_compressed, playback_speed, variant_file
+from .tts import generate_and_cache_audio
+
+HISTORY_FILE_NAME = "history.json"
+HISTORY_LOCK_NAME = "history.lock"
+FINGERPRINT_FILE_NAME = "fingerprint"
+
+MAX_HISTORY_ENTRIES = 500
+HALF_LIFE_SECONDS = 7 * 24 * 60 * 60
+
+# How long a writer waits for the history lock before giving up on
+# recording, and after how long a lock is assumed left by a dead process
+LOCK_WAIT = 2.0
+LOCK_POLL_INTERVAL = 0.01
+LOCK_TIMEOUT = 10.0
+
+REWARM_TOP_N = 25
+REWARM_INTERVAL = 1.0
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """Write ``content`` to ``path`` so readers never see a partial file."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(content)
+    os.replace(tmp_path, path)
+
+
+def phrase_score(count: int, last_spoken: float, now: float) -> float:
+    """Score a phrase by frequency, decayed by time since it was last spoken."""
+    age = max(0.0, now - last_spoken)
+    return count * 0.5 ** (age / HALF_LIFE_SECONDS)
+
+
+def load_history() -> dict[str, list]:
+    """Load phrase history as ``{text: [count, last_spoken]}``."""
+    history_file = get_cache_dir() / HISTORY_FILE_NAME
+    try:
+        history = json.loads(history_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    return history if isinstance(history, dict) else {}
+
+
+def save_history(history: dict[str, list]) -> None:
+    """Save phrase history, keeping only the highest-scoring entries."""
+    if len(history) > MAX_HISTORY_ENTRIES:
+        now = time.time()
+        ranked = sorted(
+            history.items(),
+            key=lambda item: phrase_score(item[1][0], item[1][1], now),
+            reverse=True,
+        )
+        history = dict(ranked[:MAX_HISTORY_ENTRIES])
+    history_file = get_cache_dir() / HISTORY_FILE_NAME
+    _write_atomic(history_file, json.dumps(history, separators=(",", ":")))
+
+
+@contextmanager
+def _history_lock():
+    """Hold the history lock; yield False if it could not be taken in time."""
+    lock_file = get_cache_dir() / HISTORY_LOCK_NAME
+    deadline = time.monotonic() + LOCK_WAIT
+    while True:
+        try:
+            os.close(os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_file.stat().st_mtime > LOCK_TIMEOUT:
+                    lock_file.unlink(missing_ok=True)
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                yield False
+                return
+            time.sleep(LOCK_POLL_INTERVAL)
+    try:
+        yield True
+    finally:
+        lock_file.unlink(missing_ok=True)
+
+
+def record_phrase(text: str) -> None:
+    """Record that ``text`` was spoken now.
+
+    Writers are serialized by a lock file so concurrent processes do not
+    lose each other's counts. History is best-effort: if the lock cannot be
+    taken within ``LOCK_WAIT`` seconds, the phrase is not recorded.
+    """
+    with _history_lock() as locked:
+        if not locked:
+            return
+        history = load_history()
+        count = history.get(text, [0, 0.0])[0]
+        history[text] = [count + 1, time.time()]
+        save_history(history)
+
+
+def top_phrases(limit: int) -> list[str]:
+    """Return up to ``limit`` phrases, most valuable first."""
+    now = time.time()
+    history = load_history()
+    ranked = sorted(
+        history.items(),
+        key=lambda item: phrase_score(item[1][0], item[1][1], now),
+        reverse=True,
+    )
+    return [text for text, _ in ranked[:limit]]
+
+
+def config_fingerprint(config: dict) -> str:
+    """Fingerprint the config values that decide which cache entry is played."""
+    fingerprint_string = f"{config['voice']}::{config['instructions']}"
+    speed = playback_speed(config)
+    if speed != 1.0:
+        # Kept out at normal speed so existing fingerprints stay valid
+        fingerprint_string += f"::{speed:.2f}"
+    return hashlib.md5(fingerprint_string.encode()).hexdigest()
+
+
+def fingerprint_changed(config: dict) -> bool:
+    """Store the current config fingerprint and report whether it changed.
+
+    Returns False on the very first run, when there is nothing to compare
+    against.
+    """
+    fingerprint_file = get_cache_dir() / FINGERPRINT_FILE_NAME
+    fingerprint = config_fingerprint(config)
+    try:
+        previous = fingerprint_file.read_text().strip()
+    except OSError:
+        previous = None
+
+    if previous == fingerprint:
+        return False
+    _write_atomic(fingerprint_file, fingerprint + "\n")
+    return previous is not None
+
+
+async def rewarm_cache(config: dict) -> int:
+    """Re-synthesize the top phrases that are missing from the cache.
+
+    Requests are spaced ``rewarm_interval`` seconds apart, and wait while
+    any message is being spoken, so the worker does not compete with
+    interactive use for API capacity. Returns the number of phrases
+    synthesized.
+    """
+    limit = config.get("rewarm_top_n", REWARM_TOP_N)
+    interval = config.get("rewarm_interval", REWARM_INTERVAL)
+    speed = playback_speed(config)
+
+    warmed = 0
+    attempted = False
+    for text in top_phrases(limit):
+        # Warm the entries that are played: at another speed, the
+        # time-compressed variant rather than the plain response format
+        if speed == 1.0:
+            cache_file = get_cache_file(
+                text, config["voice"], config["instructions"], config["response_format"]
+            )
+        else:
+            cache_file = variant_file(
+                get_cache_file(text, config["voice"], config["instructions"], "wav", exact=True),
+                speed,
+            )
+        if cache_file.exists():
+            continue
+        if attempted:
+            await asyncio.sleep(interval)
+        attempted = True
+        try:
+            if speed == 1.0:
+                await generate_and_cache_audio(text, config, lane=BACKGROUND)
+            else:
+                await generate_time_compressed(text, config, speed, lane=BACKGROUND)
+        except Exception as e:
+            print(f"❌ Failed to re-warm {text!r}: {e}")
+            continue
+        warmed += 1
+
+    print(f"✅ Re-warmed {warmed} cached phrases")
+    return warmed
@@ -0,0 +1,56 @@
+"""Speak a field from a JSON payload, for notification hooks.
+
+Hooks such as Claude Code's pass a JSON object on stdin. ``--json-field``
+reads it directly, so a hook can call ``speaky`` without a shell script
+and a ``jq`` process in front of it.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+
+# The TTS API rejects input longer than this
+MAX_INPUT_CHARS = 4096
+
+# ANSI escape sequences, then any remaining control characters
+ANSI_ESCAPE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*[@-~]|[@-Z\\-_])")
+CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f-\x9f]")
+
+
+def extract_field(payload: str, field: str) -> str | None:
+    """Return the string at ``field`` in a JSON ``payload``, or None.
+
+    ``field`` may be a dotted path into nested objects, such as
+    ``tool_input.command``. Invalid JSON, a missing field and a value that
+    is not a string, number or boolean all give None.
+    """
+    try:
+        value = json.loads(payload)
+    except ValueError:
+        return None
+    for key in field.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def sanitize_text(text: str, max_chars: int = MAX_INPUT_CHARS) -> str:
+    """Make arbitrary text fit to speak.
+
+    Terminal escape sequences and control characters are removed, runs of
+    whitespace collapse to a single space, and overlong text is cut at the
+    last word boundary within ``max_chars``.
+    """
+    text = ANSI_ESCAPE.sub("", text)
+    text = CONTROL_CHARS.sub(" ", text)
+    text = " ".join(text.split())
+    if len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        text = text[: cut if cut > 0 else max_chars]
+    return text
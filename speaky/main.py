@@ -3,10 +3,23 @@
 import asyncio
 import argparse
 import sys
-from .config import load_config, install_default_config
+from pathlib import Path
+from .config import load_config, active_overrides
 from .tts import generate_and_cache_audio
-from .audio import play_audio_file
-from .cache import clear_cache
+from .audio import play_audio_file, create_vlc_instance, speak_locally
+from .breaker import CircuitOpenError
+from .cache import clear_cache, get_cache_file, COMPACT_FORMAT
+from .history import record_phrase, fingerprint_changed, rewarm_cache
+from .background import spawn_detached
+from .stream import speak_stream
+from .render import render_to_file, read_batch
+from .segments import render_document, read_document
+from .hook import extract_field, sanitize_text
+from .compaction import compact_text
+from .server import serve, DEFAULT_HOST, DEFAULT_PORT
+from .transcode import compact_cache
+from .priority import PlaybackClaim, DEFAULT_PRIORITY, preempt_setting
+from .timescale import playback_speed, generate_time_compressed, variant_file
 
 
 def parse_arguments():
@@ -25,7 +38,227 @@ def parse_arguments():
         action="store_true",
         help="Clear the audio cache and exit"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="Read text from stdin and speak each sentence as it arrives"
+    )
+    parser.add_argument(
+        "--json-field",
+        metavar="FIELD",
+        help="Read a JSON object from stdin and speak its FIELD (dotted for nested fields)"
+    )
+    parser.add_argument(
+        "--fallback",
+        metavar="TEXT",
+        help="Text to speak when --json-field is missing or empty"
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write the audio to FILE instead of playing it; the format follows the extension"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Read one input per line from FILE ('-' for stdin) and join them into --output"
+    )
+    parser.add_argument(
+        "--document",
+        metavar="FILE",
+        help="Render a long document from FILE ('-' for stdin) into --output, "
+             "re-synthesizing only the segments that changed since the last render"
+    )
+    parser.add_argument(
+        "--priority",
+        type=int,
+        default=DEFAULT_PRIORITY,
+        help="Message priority; higher-priority messages interrupt lower ones "
+             f"already playing (default: {DEFAULT_PRIORITY})"
+    )
+    parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="Return at once and speak from a detached background process; "
+             "errors go to the log file in the cache directory"
+    )
+    parser.add_argument(
+        "--play-file",
+        metavar="FILE",
+        help=argparse.SUPPRESS
+    )
+    parser.add_argument(
+        "--rewarm",
+        action="store_true",
+        help="Re-synthesize frequently spoken phrases missing from the cache and exit"
+    )
+    parser.add_argument(
+        "--compact-cache",
+        action="store_true",
+        help="Transcode cached MP3 audio to compact low-bitrate Opus and exit"
+    )
+    args = parser.parse_args()
+    if args.batch and not args.output:
+        parser.error("--batch requires --output")
+    if args.document and not args.output:
+        parser.error("--document requires --output")
+    if args.fallback and not args.json_field:
+        parser.error("--fallback requires --json-field")
+    if args.json_field and args.stdin:
+        parser.error("--json-field cannot be combined with --stdin")
+    if args.document and args.batch:
+        parser.error("--document cannot be combined with --batch")
+    if args.detach and (args.stdin or args.output or args.rewarm or args.compact_cache):
+        parser.error("--detach only applies to spoken text")
+    return args
+
+
+def parse_http_arguments(argv):
+    """Parse arguments for the ``speaky http`` subcommand."""
+    parser = argparse.ArgumentParser(
+        description="Serve speech audio from the cache over local HTTP",
+        prog="speaky http"
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help=f"Address to listen on (default: {DEFAULT_HOST})"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on (default: {DEFAULT_PORT})"
+    )
+    return parser.parse_args(argv)
+
+
+async def http_main(argv):
+    """Async entry point for the ``speaky http`` subcommand."""
+    args = parse_http_arguments(argv)
+    
+    try:
+        config = load_config()
+        await serve(config, args.host, args.port)
+    except ValueError as e:
+        print(f"Configuration Error: {e}")
+        sys.exit(1)
+    except OSError as e:
+        print(f"❌ Could not listen on {args.host}:{args.port}: {e}")
+        sys.exit(1)
+
+
+async def synthesize_speech(text, config, speed):
+    """Synthesize a cache miss, time-compressed unless ``speed`` is 1.0."""
+    if speed == 1.0:
+        return await generate_and_cache_audio(text, config)
+    return await generate_time_compressed(text, config, speed)
+
+
+async def speak(text, priority=DEFAULT_PRIORITY):
+    """Speak text, overlapping the independent startup stages.
+    
+    libVLC initialization starts straight away and runs while the config is
+    loaded, the cache is checked and, on a miss, the audio is synthesized.
+    Cache hits never touch the network; the API is only contacted once the
+    cache check has found a miss.
+    
+    A playback claim at ``priority`` is held throughout, so lower-priority
+    playback in other processes stops (or ducks) and background synthesis
+    waits while this message is being prepared and played.
+    """
+    with PlaybackClaim(priority) as claim:
+        loop = asyncio.get_running_loop()
+        vlc_ready = loop.run_in_executor(None, create_vlc_instance)
+        
+        # Load configuration
+        config = await asyncio.to_thread(load_config)
+        preempt_mode = preempt_setting(config)
+        speed = playback_speed(config)
+        text = compact_text(text, config)
+        
+        cache_file = find_cached_speech(text, config)
+        if cache_file is None:
+            try:
+                cache_file = await synthesize_speech(text, config, speed)
+            except CircuitOpenError:
+                if not config.get("local_fallback"):
+                    raise
+                speak_locally(text)
+                return
+        
+        # Re-warm the cache in the background if the voice settings in the
+        # config file changed since the last run; a one-off override from
+        # the environment is not a change
+        file_config = await asyncio.to_thread(load_config, False) if active_overrides() else config
+        if fingerprint_changed(file_config):
+            spawn_detached(["--rewarm"])
+        
+        # Play audio, yielding to higher-priority messages
+        play_audio_file(cache_file, await vlc_ready, claim=claim, preempt_mode=preempt_mode)
+    
+    # Remember the phrase once it has been heard, off the path to audio
+    record_phrase(text)
+    
+    # Move new entries to the compact storage tier in the background. Only
+    # after playback, since compaction deletes the MP3 being played, and
+    # after recording, since only phrases in the history are compacted
+    if config.get("storage_format") == COMPACT_FORMAT and cache_file.suffix == ".mp3":
+        spawn_detached(["--compact-cache"])
+
+
+def find_cached_speech(text, config):
+    """Return the cache entry that ``speak()`` would play for ``text``, or None."""
+    speed = playback_speed(config)
+    if speed == 1.0:
+        cache_file = get_cache_file(
+            text, config["voice"], config["instructions"], config.get("response_format", "mp3")
+        )
+    else:
+        cache_file = variant_file(
+            get_cache_file(text, config["voice"], config["instructions"], "wav", exact=True),
+            speed,
+        )
+    return cache_file if cache_file.exists() else None
+
+
+def detach(text, priority=DEFAULT_PRIORITY):
+    """Hand ``text`` to a detached process and return without waiting.
+    
+    The cache is checked here, so a hit only leaves playback (and recording
+    the phrase) to the child; a miss leaves synthesis as well. The child's
+    output, including any error, goes to the log file in the cache
+    directory.
+    """
+    try:
+        config = load_config()
+        text = compact_text(text, config)
+        cache_file = find_cached_speech(text, config)
+    except ValueError:
+        # Let the child report configuration errors in the log
+        cache_file = None
+    
+    if cache_file is None:
+        spawn_detached(["--priority", str(priority), "--", text])
+        return
+    
+    spawn_detached(["--play-file", str(cache_file), "--priority", str(priority), "--", text])
+
+
+async def play_file(file_path, priority=DEFAULT_PRIORITY, text=None):
+    """Play an audio file at ``priority``, as ``speak()`` plays cache entries.
+    
+    ``text``, if given, is recorded in the phrase history after playback.
+    """
+    with PlaybackClaim(priority) as claim:
+        loop = asyncio.get_running_loop()
+        vlc_ready = loop.run_in_executor(None, create_vlc_instance)
+        config = await asyncio.to_thread(load_config)
+        preempt_mode = preempt_setting(config)
+        play_audio_file(file_path, await vlc_ready, claim=claim, preempt_mode=preempt_mode)
+    
+    if text is not None:
+        record_phrase(text)
 
 
 async def main():
@@ -38,24 +271,63 @@ async def main():
         return
     
     # Get text input
-    if args.text:
+    if args.json_field:
+        field = extract_field(sys.stdin.read(), args.json_field)
+        text = sanitize_text(field or "") or args.fallback
+        if not text:
+            print(f"❌ No '{args.json_field}' field in the JSON input")
+            sys.exit(1)
+    elif args.text:
         text = " ".join(args.text)
     else:
         text = "What would you like me to say?"
     
     try:
-        # Load configuration
-        config = load_config()
+        if args.detach:
+            detach(text, args.priority)
+            return
+        
+        if args.play_file:
+            await play_file(Path(args.play_file), args.priority, text if args.text else None)
+            return
+        
+        if not (args.rewarm or args.compact_cache or args.stdin or args.output):
+            await speak(text, args.priority)
+            return
         
-        # Generate and cache audio
-        cache_file = await generate_and_cache_audio(text, config)
+        # Load configuration. Re-warming is for the voice in the config
+        # file, not an override inherited from the process that spawned it
+        config = load_config(overrides=not args.rewarm)
         
-        # Play audio
-        play_audio_file(cache_file)
+        if args.rewarm:
+            await rewarm_cache(config)
+            return
+        
+        if args.compact_cache:
+            await asyncio.to_thread(compact_cache, config)
+            return
+        
+        if args.stdin:
+            await speak_stream(sys.stdin.buffer, config, args.priority)
+            return
+        
+        if args.document:
+            synthesized, total = await render_document(
+                read_document(args.document), config, Path(args.output)
+            )
+            print(f"✅ Wrote {args.output} ({synthesized} of {total} segments synthesized)")
+            return
+        
+        parts = read_batch(args.batch) if args.batch else [text]
+        await render_to_file(parts, config, Path(args.output))
+        print(f"✅ Wrote {args.output}")
         
     except ValueError as e:
         print(f"Configuration Error: {e}")
         sys.exit(1)
+    except CircuitOpenError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     except ImportError:
         print("Error: Required package not installed")
         print("Make sure all dependencies are installed.")
@@ -67,9 +339,11 @@ async def main():
 
 def cli_main():
     """Entry point for console script."""
-    install_default_config()
     try:
-        asyncio.run(main())
+        if sys.argv[1:2] == ["http"]:
+            asyncio.run(http_main(sys.argv[2:]))
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         print("\nInterrupted by user")
         sys.exit(1)
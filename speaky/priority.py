@@ -0,0 +1,121 @@
+"""Message priority and playback preemption across Speaky processes.
+
+Every ``speaky`` invocation that is about to speak registers a claim file
+holding its priority in the cache directory, and refreshes it from a
+heartbeat thread until it is done. A player that sees a live claim with a
+higher priority than its own stops, or ducks its volume, so an urgent
+message never waits behind one that is already playing. Background
+synthesis waits until no claims are left, so it never competes with a
+message someone is waiting to hear.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from .config import get_cache_dir
+
+CLAIMS_DIR_NAME = "claims"
+
+DEFAULT_PRIORITY = 0
+HEARTBEAT_INTERVAL = 1.0
+# A claim that has not been refreshed within this time belongs to a
+# process that died without cleaning up
+CLAIM_TIMEOUT = 5.0
+IDLE_POLL_INTERVAL = 0.2
+
+PREEMPT_STOP = "stop"
+PREEMPT_DUCK = "duck"
+PREEMPT_MODES = (PREEMPT_STOP, PREEMPT_DUCK)
+DUCK_VOLUME = 30
+
+
+def preempt_setting(config: dict) -> str:
+    """Return the configured preempt mode, validating it."""
+    preempt_mode = config.get("preempt_mode", PREEMPT_STOP)
+    if preempt_mode not in PREEMPT_MODES:
+        raise ValueError(
+            f"Invalid preempt_mode '{preempt_mode}'. "
+            f"Use one of: {', '.join(PREEMPT_MODES)}"
+        )
+    return preempt_mode
+
+
+def get_claims_dir() -> Path:
+    """Get the directory holding playback claims, creating it if needed."""
+    claims_dir = get_cache_dir() / CLAIMS_DIR_NAME
+    claims_dir.mkdir(exist_ok=True)
+    return claims_dir
+
+
+def active_priorities(exclude: Path | None = None) -> list[int]:
+    """Return the priorities of all live claims, removing stale ones."""
+    now = time.time()
+    priorities = []
+    for claim_file in get_claims_dir().glob("*.claim"):
+        if claim_file == exclude:
+            continue
+        try:
+            mtime = claim_file.stat().st_mtime
+            priority = int(claim_file.read_text())
+        except (OSError, ValueError):
+            # Gone, or not written yet
+            continue
+        if now - mtime > CLAIM_TIMEOUT:
+            claim_file.unlink(missing_ok=True)
+            continue
+        priorities.append(priority)
+    return priorities
+
+
+class PlaybackClaim:
+    """Announce that this process is speaking at a given priority.
+
+    Use as a context manager around synthesis and playback.
+    """
+
+    def __init__(self, priority: int = DEFAULT_PRIORITY):
+        self.priority = priority
+        self.path = get_claims_dir() / f"{os.getpid()}-{uuid.uuid4().hex}.claim"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> PlaybackClaim:
+        self.path.write_text(str(self.priority))
+        self._thread = threading.Thread(target=self._heartbeat, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.path.unlink(missing_ok=True)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+
+    def outranked(self) -> bool:
+        """Return True if another process is speaking at a higher priority."""
+        return any(
+            priority > self.priority for priority in active_priorities(exclude=self.path)
+        )
+
+
+async def wait_until_idle() -> None:
+    """Wait until no process holds a playback claim.
+
+    Background synthesis calls this before each API request so that
+    interactive messages always go first.
+    """
+    while active_priorities():
+        await asyncio.sleep(IDLE_POLL_INTERVAL)
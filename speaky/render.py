@@ -0,0 +1,210 @@
+"""Render speech to audio files instead of playing it."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .cache import AUDIO_FORMATS
+from .scheduler import BACKGROUND, SYNTHESIS_CONCURRENCY
+from .tts import generate_and_cache_audio
+
+# Formats whose parts can be joined without re-encoding
+CONCAT_FORMATS = ("mp3", "wav", "pcm")
+
+# Per render; by default the scheduler's limit is the one that applies
+RENDER_CONCURRENCY = SYNTHESIS_CONCURRENCY
+
+# MPEG audio Layer III bitrates (kbit/s) by bitrate index
+_MPEG1_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_MPEG2_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+# Sample rates (Hz) by MPEG version bits, then sample rate index
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG 1
+    2: (22050, 24000, 16000),  # MPEG 2
+    0: (11025, 12000, 8000),  # MPEG 2.5
+}
+
+
+def read_batch(path: str) -> list[str]:
+    """Read one input per non-empty line from ``path`` (``-`` for stdin)."""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(path).read_text().splitlines()
+    return [line.strip() for line in lines if line.strip()]
+
+
+def _mp3_frame_length(header: bytes) -> int:
+    """Return the length of the Layer III frame starting with ``header``, or 0."""
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return 0
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if (
+        version == 1
+        or layer != 1
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return 0
+
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    if version == 3:
+        return 144000 * _MPEG1_BITRATES[bitrate_index] // sample_rate + padding
+    return 72000 * _MPEG2_BITRATES[bitrate_index] // sample_rate + padding
+
+
+def _mp3_frames(data: bytes) -> bytes:
+    """Strip ID3 tags and the Xing/Info header frame from an MP3 file.
+
+    What remains is the raw audio frames, which can be appended to the
+    frames of another MP3 with the same encoding.
+    """
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        tag_size = 0
+        for byte in data[6:10]:
+            tag_size = (tag_size << 7) | (byte & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        start = 10 + tag_size + footer
+
+    end = len(data)
+    if end - start >= 128 and data[end - 128 : end - 125] == b"TAG":
+        end -= 128
+
+    frame_length = _mp3_frame_length(data[start : start + 4])
+    if frame_length:
+        first_frame = data[start : start + frame_length]
+        if b"Xing" in first_frame or b"Info" in first_frame or b"VBRI" in first_frame:
+            start += frame_length
+    return data[start:end]
+
+
+def _wav_chunks(data: bytes) -> tuple[bytes, bytes]:
+    """Split a WAV file into its ``fmt `` chunk body and its sample data."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        size = int.from_bytes(data[pos + 4 : pos + 8], "little")
+        body = pos + 8
+        if chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV file has no fmt chunk")
+            # Streamed WAV output may not know its length up front
+            if size in (0, 0xFFFFFFFF):
+                return fmt, data[body:]
+            return fmt, data[body : body + size]
+        if chunk_id == b"fmt ":
+            fmt = data[body : body + size]
+        pos = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def extract_audio_payload(path: str, response_format: str) -> tuple[bytes, bytes]:
+    """Read an audio file and return ``(stream_format, payload)``.
+
+    ``payload`` is the part of the file that can be concatenated with other
+    parts; ``stream_format`` describes its encoding and must match across
+    parts. Runs in a worker process.
+    """
+    data = Path(path).read_bytes()
+    if response_format == "wav":
+        return _wav_chunks(data)
+    if response_format == "mp3":
+        return b"", _mp3_frames(data)
+    if response_format == "pcm":
+        return b"", data
+    raise ValueError(f"Cannot concatenate {response_format} audio")
+
+
+def write_concatenated(
+    parts: list[tuple[bytes, bytes]], output: Path, response_format: str
+) -> None:
+    """Write extracted parts back to back as a single audio file."""
+    if response_format == "wav":
+        formats = {stream_format for stream_format, _ in parts}
+        if len(formats) > 1:
+            raise ValueError("Cannot concatenate WAV parts with different formats")
+        (fmt,) = formats
+        data_size = sum(len(payload) for _, payload in parts)
+        riff_size = 4 + (8 + len(fmt)) + (8 + data_size + (data_size & 1))
+        with open(output, "wb") as f:
+            f.write(b"RIFF" + riff_size.to_bytes(4, "little") + b"WAVE")
+            f.write(b"fmt " + len(fmt).to_bytes(4, "little") + fmt)
+            f.write(b"data" + data_size.to_bytes(4, "little"))
+            for _, payload in parts:
+                f.write(payload)
+            if data_size & 1:
+                f.write(b"\x00")
+        return
+
+    with open(output, "wb") as f:
+        for _, payload in parts:
+            f.write(payload)
+
+
+async def render_to_file(parts: list[str], config: dict, output: Path) -> Path:
+    """Synthesize ``parts`` and write them to ``output`` as one audio file.
+
+    The output format follows the file extension. Parts are synthesized
+    concurrently (and cached like any other speech), their audio payloads
+    are extracted in a process pool as soon as each part is ready, and the
+    payloads are joined without re-encoding or added silence. WAV and PCM
+    joins are sample-exact; MP3 parts are joined at frame boundaries.
+    """
+    if not parts:
+        raise ValueError("No text to render")
+    response_format = output.suffix.lstrip(".").lower()
+    if response_format not in AUDIO_FORMATS:
+        raise ValueError(
+            f"Unsupported output format '{output.suffix}'. "
+            f"Use one of: {', '.join(AUDIO_FORMATS)}"
+        )
+    if len(parts) > 1 and response_format not in CONCAT_FORMATS:
+        raise ValueError(
+            f"Cannot join several inputs into a {response_format} file. "
+            f"Use one of: {', '.join(CONCAT_FORMATS)}"
+        )
+
+    part_config = {**config, "response_format": response_format}
+    semaphore = asyncio.Semaphore(config.get("render_concurrency", RENDER_CONCURRENCY))
+
+    async def synthesize(text: str) -> Path:
+        async with semaphore:
+            return await generate_and_cache_audio(
+                text, part_config, exact_format=True, lane=BACKGROUND
+            )
+
+    if len(parts) == 1:
+        cache_file = await synthesize(parts[0])
+        await asyncio.to_thread(shutil.copyfile, cache_file, output)
+        return output
+
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor() as pool:
+
+        async def render_part(text: str) -> tuple[bytes, bytes]:
+            cache_file = await synthesize(text)
+            return await loop.run_in_executor(
+                pool, extract_audio_payload, str(cache_file), response_format
+            )
+
+        # Repeated inputs are synthesized and extracted once
+        unique = list(dict.fromkeys(parts))
+        payloads = dict(zip(unique, await asyncio.gather(*map(render_part, unique))))
+
+    await asyncio.to_thread(
+        write_concatenated, [payloads[text] for text in parts], output, response_format
+    )
+    return output
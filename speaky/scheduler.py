@@ -0,0 +1,116 @@
+"""Scheduling of API synthesis requests within a process.
+
+Every cache miss goes through one scheduler in front of the API, in one of
+two lanes:
+
+- ``interactive``: speech someone is waiting for (spoken text, ``--stdin``
+  sentences, ``speaky http`` requests)
+- ``background``: bulk work such as re-warming and rendering with
+  ``--output``, ``--batch`` or ``--document``
+
+At most ``limit`` requests run at once. On top of that, ``reserve`` slots
+are kept for the interactive lane only, so an interactive miss starts
+straight away even while background work fills every regular slot, and
+background work still gets all regular slots when nothing else is going
+on. When both lanes have requests waiting, freed slots are shared by
+smooth weighted round-robin, ``LANE_WEIGHTS`` to one in favour of
+interactive requests, so a steady interactive load slows bulk work down
+without starving it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+SYNTHESIS_CONCURRENCY = 8
+INTERACTIVE_RESERVE = 2
+LANE_WEIGHTS = {INTERACTIVE: 4, BACKGROUND: 1}
+
+
+class SynthesisScheduler:
+    """Admit synthesis requests from the interactive and background lanes."""
+
+    def __init__(
+        self,
+        limit: int = SYNTHESIS_CONCURRENCY,
+        reserve: int = INTERACTIVE_RESERVE,
+        weights: dict[str, int] | None = None,
+    ):
+        if limit < 1 or reserve < 0:
+            raise ValueError("Scheduler needs a limit of at least 1 and a reserve of at least 0")
+        self.limit = limit
+        self.reserve = reserve
+        self.weights = {**LANE_WEIGHTS, **(weights or {})}
+        self.running = {lane: 0 for lane in LANES}
+        self._waiting: dict[str, deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._credit = {lane: 0 for lane in LANES}
+
+    def _capacity(self, lane: str) -> int:
+        return self.limit + (self.reserve if lane == INTERACTIVE else 0)
+
+    def _has_room(self, lane: str) -> bool:
+        return sum(self.running.values()) < self._capacity(lane)
+
+    def waiting(self, lane: str) -> int:
+        """Return how many requests in ``lane`` are waiting for a slot."""
+        return sum(not future.done() for future in self._waiting[lane])
+
+    def _next_lane(self) -> str | None:
+        """Pick the lane to admit next by smooth weighted round-robin."""
+        eligible = [lane for lane in LANES if self.waiting(lane) and self._has_room(lane)]
+        if not eligible:
+            return None
+        if len(eligible) == 1:
+            return eligible[0]
+        total = 0
+        for lane in eligible:
+            self._credit[lane] += self.weights[lane]
+            total += self.weights[lane]
+        chosen = max(eligible, key=self._credit.__getitem__)
+        self._credit[chosen] -= total
+        return chosen
+
+    def _dispatch(self) -> None:
+        while (lane := self._next_lane()) is not None:
+            queue = self._waiting[lane]
+            while queue[0].done():
+                # Cancelled while waiting
+                queue.popleft()
+            queue.popleft().set_result(None)
+            self.running[lane] += 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str = INTERACTIVE) -> AsyncIterator[None]:
+        """Hold a synthesis slot in ``lane`` for the duration of the block."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown synthesis lane '{lane}'. Use one of: {', '.join(LANES)}")
+
+        # Requests already waiting go first; interactive ones are never
+        # held back by waiting background requests
+        ahead = self.waiting(lane) + (self.waiting(INTERACTIVE) if lane == BACKGROUND else 0)
+        if not ahead and self._has_room(lane):
+            self.running[lane] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[lane].append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Admitted just as the wait was cancelled
+                    self.running[lane] -= 1
+                    self._dispatch()
+                raise
+
+        try:
+            yield
+        finally:
+            self.running[lane] -= 1
+            self._dispatch()
@@ -0,0 +1,88 @@
+"""Diff-aware rendering of long documents.
+
+A document is cut into segments of a few sentences each, and each segment
+is synthesized and cached on its own. Segment boundaries are chosen from
+the content of the sentences themselves (a sentence whose hash falls in a
+fixed bucket ends a segment), not from their position, so an edit only
+changes the segment it lands in: every other segment keeps its text, its
+cache key and its cached audio. Re-rendering an edited document therefore
+costs roughly the size of the edit rather than the size of the document.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+from .cache import get_cache_file
+from .render import render_to_file
+from .stream import SentenceSplitter
+
+# Average number of sentences per segment
+SEGMENT_SENTENCES = 4
+MAX_SEGMENT_CHARS = 1000
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def read_document(path: str) -> str:
+    """Read a document from ``path`` (``-`` for stdin)."""
+    if path == "-":
+        return sys.stdin.read()
+    return Path(path).read_text()
+
+
+def _ends_segment(sentence: str) -> bool:
+    digest = hashlib.md5(sentence.encode()).digest()
+    return int.from_bytes(digest[:4], "big") % SEGMENT_SENTENCES == 0
+
+
+def split_segments(document: str, max_chars: int = MAX_SEGMENT_CHARS) -> list[str]:
+    """Split a document into content-defined segments.
+
+    Paragraphs always end a segment. Whitespace inside a paragraph is
+    normalized first, so re-wrapping lines does not change any segment.
+    """
+    segments = []
+    for paragraph in PARAGRAPH_BREAK.split(document):
+        text = " ".join(paragraph.split())
+        if not text:
+            continue
+        splitter = SentenceSplitter(max_chars)
+        current: list[str] = []
+        length = 0
+        for sentence in splitter.feed(text + " ") + splitter.flush():
+            if current and length + 1 + len(sentence) > max_chars:
+                segments.append(" ".join(current))
+                current, length = [], 0
+            current.append(sentence)
+            length += len(sentence) + (1 if length else 0)
+            if _ends_segment(sentence):
+                segments.append(" ".join(current))
+                current, length = [], 0
+        if current:
+            segments.append(" ".join(current))
+    return segments
+
+
+async def render_document(document: str, config: dict, output: Path) -> tuple[int, int]:
+    """Render a document to ``output``, reusing cached segments.
+
+    Returns ``(synthesized, total)``: how many segments needed the API, out
+    of how many in the document.
+    """
+    segments = split_segments(document)
+    if not segments:
+        raise ValueError("Document is empty")
+    response_format = output.suffix.lstrip(".").lower()
+    missing = {
+        segment
+        for segment in segments
+        if not get_cache_file(
+            segment, config["voice"], config["instructions"], response_format, exact=True
+        ).exists()
+    }
+    await render_to_file(segments, config, output)
+    return len(missing), len(segments)
@@ -0,0 +1,338 @@
+"""Local HTTP endpoint serving cached speech audio.
+
+``POST /`` with a JSON body ``{"text": ..., "voice": ...}`` returns the
+audio bytes. Cache hits are sent with ``sendfile`` and support ETag and
+Range requests; misses are streamed to the client while they are being
+written to the cache, and concurrent requests for the same audio share a
+single API call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from pathlib import Path
+
+from .breaker import CircuitOpenError
+from .cache import get_cache_file
+from .compaction import compact_text, compaction_settings
+from .tts import generate_and_cache_audio
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024
+
+CONTENT_TYPES = {
+    "mp3": "audio/mpeg",
+    "opus": "audio/ogg",
+    "aac": "audio/aac",
+    "flac": "audio/flac",
+    "wav": "audio/wav",
+    "pcm": "audio/L16",
+}
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class HTTPError(Exception):
+    """An error that maps to an HTTP error response."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Parse a single-range ``Range`` header into ``(start, end)``, inclusive.
+
+    Returns None if the header is not a single byte range we understand, in
+    which case the whole file is served. Raises ``HTTPError`` if the range
+    cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end or start >= size:
+        raise HTTPError(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, "Range not satisfiable")
+    return start, end
+
+
+def _entry_headers(cache_file: Path) -> dict:
+    """Return the headers describing a cache entry.
+
+    The entry may have been compacted to another format, so both the ETag
+    and the content type follow the file actually served.
+    """
+    return {
+        "Content-Type": CONTENT_TYPES.get(
+            cache_file.suffix.lstrip("."), "application/octet-stream"
+        ),
+        "ETag": f'"{cache_file.name}"',
+        "Cache-Control": "max-age=31536000, immutable",
+    }
+
+
+class _Synthesis:
+    """Audio being synthesized, shared by every request waiting for it."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        # The cache entry once written; set before ``finish``
+        self.path: Path | None = None
+        self.finished = False
+        self.error: BaseException | None = None
+        self._updated = asyncio.Event()
+
+    def add(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+        self._wake()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.finished = True
+        self.error = error
+        self._wake()
+
+    def _wake(self) -> None:
+        self._updated.set()
+        self._updated = asyncio.Event()
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Yield every chunk from the start, waiting for new ones until done."""
+        index = 0
+        while True:
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._updated.wait()
+
+
+class SpeechServer:
+    """Serve speech audio over HTTP from the Speaky cache."""
+
+    def __init__(self, config: dict):
+        compaction_settings(config)  # Reject a bad setting at startup
+        self.config = config
+        self._inflight: dict[Path, _Synthesis] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one HTTP connection."""
+        try:
+            try:
+                method, headers, body = await self._read_request(reader)
+                if method != "POST":
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+                await self._respond(writer, headers, body)
+            except HTTPError as e:
+                await self._send_error(writer, e.status, str(e))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[str, dict[str, str], bytes]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large")
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        method = request_line.split(" ", 1)[0]
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method, headers, body
+
+    def _speech_config(self, body: bytes) -> tuple[str, dict]:
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(request, dict) or not str(request.get("text", "")).strip():
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Missing 'text'")
+
+        config = dict(self.config)
+        for key in ("voice", "instructions"):
+            if request.get(key):
+                config[key] = str(request[key])
+        return compact_text(str(request["text"]).strip(), config), config
+
+    async def _respond(self, writer: asyncio.StreamWriter, headers: dict, body: bytes):
+        text, config = self._speech_config(body)
+        cache_file = get_cache_file(
+            text, config["voice"], config["instructions"], config["response_format"]
+        )
+        common_headers = _entry_headers(cache_file)
+        etag = common_headers["ETag"]
+
+        if headers.get("if-none-match") in (etag, "*"):
+            await self._send_head(writer, HTTPStatus.NOT_MODIFIED, {"ETag": etag})
+            return
+
+        try:
+            size = cache_file.stat().st_size
+        except FileNotFoundError:
+            await self._stream_miss(writer, text, config, cache_file, common_headers)
+            return
+        await self._send_file(writer, cache_file, size, headers.get("range"), common_headers)
+
+    async def _send_file(
+        self,
+        writer: asyncio.StreamWriter,
+        cache_file: Path,
+        size: int,
+        range_header: str | None,
+        common_headers: dict,
+    ):
+        status = HTTPStatus.OK
+        start, end = 0, size - 1
+        response_headers = {**common_headers, "Accept-Ranges": "bytes"}
+        if range_header:
+            try:
+                byte_range = parse_range(range_header, size)
+            except HTTPError:
+                response_headers = {"Content-Range": f"bytes */{size}", "Content-Length": "0"}
+                await self._send_head(
+                    writer, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, response_headers
+                )
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+                response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        count = end - start + 1 if size else 0
+        response_headers["Content-Length"] = str(count)
+        await self._send_head(writer, status, response_headers)
+        if count:
+            loop = asyncio.get_running_loop()
+            with open(cache_file, "rb") as f:
+                await loop.sendfile(writer.transport, f, start, count)
+
+    async def _stream_miss(
+        self,
+        writer: asyncio.StreamWriter,
+        text: str,
+        config: dict,
+        cache_file: Path,
+        common_headers: dict,
+    ):
+        synthesis = self._inflight.get(cache_file)
+        if synthesis is None:
+            synthesis = self._start_synthesis(text, config, cache_file)
+
+        chunks = synthesis.iter_chunks()
+        try:
+            first_chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+            # Another process wrote the entry after our lookup, so no audio
+            # was streamed; serve the finished file instead
+            if synthesis.path is not None and synthesis.path.exists():
+                await self._send_file(
+                    writer, synthesis.path, synthesis.path.stat().st_size,
+                    None, _entry_headers(synthesis.path),
+                )
+                return
+        except CircuitOpenError as e:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(e))
+        except Exception as e:
+            raise HTTPError(HTTPStatus.BAD_GATEWAY, f"Speech synthesis failed: {e}")
+
+        await self._send_head(
+            writer, HTTPStatus.OK, {**common_headers, "Transfer-Encoding": "chunked"}
+        )
+        if first_chunk:
+            await self._send_chunk(writer, first_chunk)
+        try:
+            async for chunk in chunks:
+                await self._send_chunk(writer, chunk)
+        except Exception:
+            # Headers are already sent; closing without the final chunk
+            # tells the client the response is incomplete
+            return
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _start_synthesis(self, text: str, config: dict, cache_file: Path) -> _Synthesis:
+        synthesis = _Synthesis()
+        self._inflight[cache_file] = synthesis
+
+        async def synthesize():
+            try:
+                synthesis.path = await generate_and_cache_audio(
+                    text, config, on_chunk=synthesis.add
+                )
+            except Exception as e:
+                print(f"❌ Speech synthesis failed: {e}")
+                synthesis.finish(e)
+            else:
+                synthesis.finish()
+            finally:
+                del self._inflight[cache_file]
+
+        # The task is independent of any one client, so the cache entry is
+        # completed even if every waiting client disconnects
+        task = asyncio.create_task(synthesize())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return synthesis
+
+    async def _send_chunk(self, writer: asyncio.StreamWriter, chunk: bytes):
+        writer.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+        await writer.drain()
+
+    async def _send_head(
+        self, writer: asyncio.StreamWriter, status: HTTPStatus, headers: dict
+    ):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        lines.append("Connection: close")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+    async def _send_error(
+        self, writer: asyncio.StreamWriter, status: HTTPStatus, message: str
+    ):
+        body = json.dumps({"error": message}).encode()
+        await self._send_head(
+            writer,
+            status,
+            {"Content-Type": "application/json", "Content-Length": str(len(body))},
+        )
+        writer.write(body)
+        await writer.drain()
+
+
+async def serve(config: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    """Serve speech over HTTP until cancelled."""
+    speech_server = SpeechServer(config)
+    server = await asyncio.start_server(speech_server.handle, host, port)
+    print(f"🔊 Serving speech on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,176 @@
+"""Incremental speech from streamed input."""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import concurrent.futures
+import functools
+import os
+import re
+import threading
+from typing import BinaryIO
+
+from .audio import play_audio_file
+from .compaction import compact_text, compaction_settings
+from .priority import (
+    DEFAULT_PRIORITY, IDLE_POLL_INTERVAL, PREEMPT_STOP, PlaybackClaim, preempt_setting,
+)
+from .timescale import generate_time_compressed, playback_speed
+from .tts import generate_and_cache_audio
+
+# Sentence punctuation (plus closing quotes/brackets) followed by
+# whitespace, or a line break
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n")
+
+MAX_SENTENCE_CHARS = 400
+MAX_PENDING_SENTENCES = 3
+MAX_PENDING_CHUNKS = 4
+READ_SIZE = 4096
+
+
+class SentenceSplitter:
+    """Cut incrementally fed text into sentences.
+
+    Text without a sentence boundary is held back until more input
+    arrives, but never more than ``max_chars``: an overlong run is cut at
+    its last space instead so memory stays bounded.
+    """
+
+    def __init__(self, max_chars: int = MAX_SENTENCE_CHARS):
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add text and return the sentences it completed."""
+        self._buffer += text
+        sentences = []
+        while True:
+            match = SENTENCE_END.search(self._buffer)
+            if match and match.end() <= self.max_chars:
+                cut = match.end()
+            elif len(self._buffer) > self.max_chars:
+                cut = self._buffer.rfind(" ", 0, self.max_chars) + 1 or self.max_chars
+            else:
+                break
+            sentence = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if sentence:
+                sentences.append(sentence)
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Return whatever text is left once input has ended."""
+        sentence = self._buffer.strip()
+        self._buffer = ""
+        return [sentence] if sentence else []
+
+
+def _start_reader(
+    stream: BinaryIO, loop: asyncio.AbstractEventLoop, chunks: asyncio.Queue
+) -> None:
+    """Read ``stream`` on a daemon thread, feeding chunks into ``chunks``.
+
+    The thread blocks while the queue is full, so a fast producer is held
+    back by the pipe rather than buffered in memory. An empty chunk marks
+    the end of input. The thread stops quietly once the event loop stops
+    taking chunks.
+    """
+    try:
+        fd = stream.fileno()
+    except OSError:
+        read_chunk = lambda: stream.read1(READ_SIZE)
+    else:
+        # Reading the descriptor does not hold the buffered reader's lock,
+        # which would abort interpreter shutdown while a read is blocked
+        read_chunk = lambda: os.read(fd, READ_SIZE)
+
+    def put(data: bytes) -> bool:
+        coroutine = chunks.put(data)
+        try:
+            asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+        except (RuntimeError, concurrent.futures.CancelledError):
+            # Event loop closed, or the put cancelled, before input ended
+            coroutine.close()
+            return False
+        return True
+
+    def read() -> None:
+        while data := read_chunk():
+            if not put(data):
+                return
+        put(b"")
+
+    threading.Thread(target=read, name="speaky-stdin", daemon=True).start()
+
+
+async def speak_stream(
+    stream: BinaryIO, config: dict, priority: int = DEFAULT_PRIORITY
+) -> int:
+    """Speak text from ``stream`` sentence by sentence as it arrives.
+
+    Each finished sentence is synthesized right away while earlier ones
+    are still playing, and sentences are played in input order. Returns
+    the number of sentences spoken.
+
+    A playback claim at ``priority`` is held throughout, as for spoken
+    text. A sentence cut off by a higher-priority message is not repeated,
+    and with ``preempt_mode`` "stop" the next one waits until that message
+    is done.
+    """
+    # Reject bad settings before reading input
+    compaction_settings(config)
+    preempt_mode = preempt_setting(config)
+    speed = playback_speed(config)
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_CHUNKS)
+    pending: asyncio.Queue = asyncio.Queue(maxsize=MAX_PENDING_SENTENCES)
+    # Started but not yet played, kept bounded by the pending queue
+    syntheses: set[asyncio.Task] = set()
+
+    async def produce() -> None:
+        splitter = SentenceSplitter()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while True:
+            data = await chunks.get()
+            text = decoder.decode(data, final=not data)
+            sentences = splitter.feed(text)
+            if not data:
+                sentences += splitter.flush()
+            for sentence in sentences:
+                sentence = compact_text(sentence, config)
+                if speed == 1.0:
+                    synthesis = generate_and_cache_audio(sentence, config)
+                else:
+                    synthesis = generate_time_compressed(sentence, config, speed)
+                task = asyncio.create_task(synthesis)
+                syntheses.add(task)
+                await pending.put(task)
+            if not data:
+                break
+        await pending.put(None)
+
+    _start_reader(stream, loop, chunks)
+    producer = asyncio.create_task(produce())
+    spoken = 0
+    try:
+        with PlaybackClaim(priority) as claim:
+            while (synthesis := await pending.get()) is not None:
+                cache_file = await synthesis
+                syntheses.discard(synthesis)
+                while preempt_mode == PREEMPT_STOP and claim.outranked():
+                    await asyncio.sleep(IDLE_POLL_INTERVAL)
+                play = functools.partial(
+                    play_audio_file, cache_file, claim=claim, preempt_mode=preempt_mode
+                )
+                await loop.run_in_executor(None, play)
+                spoken += 1
+            await producer
+    finally:
+        producer.cancel()
+        for synthesis in syntheses:
+            synthesis.cancel()
+        # Retrieve every outcome, so failures of sentences that will never
+        # be played are not reported again as unretrieved exceptions
+        await asyncio.gather(producer, *syntheses, return_exceptions=True)
+    return spoken
@@ -0,0 +1,139 @@
+"""Pitch-preserving time compression of cached speech.
+
+With ``playback_speed`` set in the config (for example ``1.3``), speech is
+synthesized as WAV, time-compressed once with WSOLA (waveform-similarity
+overlap-add), and stored as its own cache entry next to the original. Later
+runs play the compressed entry directly, so there is no per-playback cost
+and no resampling artefacts from changing the player's rate.
+
+WSOLA keeps the pitch by cutting the signal into overlapping frames and
+laying them down closer together. Each frame is shifted within a small
+tolerance to the position whose waveform best continues the previous
+frame, so the joins stay in phase. The search for that position is a
+single matrix-vector product per frame.
+
+Requires numpy, which is imported only when compression is used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import uuid
+from pathlib import Path
+
+from openai import AsyncOpenAI
+
+from .cache import get_cache_file
+from .render import _wav_chunks, write_concatenated
+from .scheduler import INTERACTIVE
+from .tts import generate_and_cache_audio
+
+MIN_SPEED = 0.5
+MAX_SPEED = 2.0
+# Analysis frame length; long enough to span a couple of pitch periods
+FRAME_SECONDS = 0.03
+
+
+def playback_speed(config: dict) -> float:
+    """Return the configured playback speed, validating it."""
+    try:
+        speed = float(config.get("playback_speed", 1.0))
+    except (TypeError, ValueError):
+        raise ValueError("playback_speed must be a number")
+    if not MIN_SPEED <= speed <= MAX_SPEED:
+        raise ValueError(f"playback_speed must be between {MIN_SPEED} and {MAX_SPEED}")
+    return speed
+
+
+def variant_file(cache_file: Path, speed: float) -> Path:
+    """Return the cache path of ``cache_file`` played at ``speed``."""
+    return cache_file.with_name(f"{cache_file.stem}.x{speed:.2f}.wav")
+
+
+def wsola(samples, sample_rate: int, speed: float):
+    """Time-scale ``samples`` (frames x channels) by ``1 / speed``.
+
+    Returns float samples in the same layout, ``speed`` times shorter.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    frame = int(sample_rate * FRAME_SECONDS) // 2 * 2
+    synthesis_hop = frame // 2
+    analysis_hop = synthesis_hop * speed
+    tolerance = synthesis_hop // 2
+    # Periodic Hann windows at 50% overlap sum to one
+    window = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(frame) / frame)
+
+    pad = 3 * frame
+    padded = np.pad(samples, ((pad, pad), (0, 0)))
+    mono = padded.mean(axis=1)
+    # One extra frame so the overlap-add is complete up to the last sample
+    frames = int(len(samples) / analysis_hop) + 2
+
+    output = np.zeros((frames * synthesis_hop + frame, samples.shape[1]))
+    position = pad
+    for index in range(frames):
+        # Frames are centred on their nominal input position
+        nominal = pad - synthesis_hop + int(round(index * analysis_hop))
+        if index:
+            # Find the shift around the nominal position whose waveform best
+            # matches the natural continuation of the previous frame
+            natural = mono[position + synthesis_hop : position + synthesis_hop + frame]
+            region = mono[nominal - tolerance : nominal + tolerance + frame]
+            scores = sliding_window_view(region, frame) @ natural
+            position = nominal - tolerance + int(np.argmax(scores))
+        else:
+            position = nominal
+        start = index * synthesis_hop
+        output[start : start + frame] += padded[position : position + frame] * window[:, None]
+
+    length = int(round(len(samples) / speed))
+    # Output starts at the centre of the first frame
+    return output[synthesis_hop : synthesis_hop + length]
+
+
+def time_compress_file(source: Path, target: Path, speed: float) -> None:
+    """Write ``source`` (16-bit PCM WAV) to ``target`` played at ``speed``."""
+    import numpy as np
+
+    fmt, data = _wav_chunks(source.read_bytes())
+    format_tag = int.from_bytes(fmt[0:2], "little")
+    channels = int.from_bytes(fmt[2:4], "little")
+    sample_rate = int.from_bytes(fmt[4:8], "little")
+    bits = int.from_bytes(fmt[14:16], "little")
+    if format_tag != 1 or bits != 16:
+        raise ValueError("Only 16-bit PCM WAV audio can be time-compressed")
+
+    data = data[: len(data) // (2 * channels) * 2 * channels]
+    samples = np.frombuffer(data, dtype="<i2").reshape(-1, channels).astype(np.float64)
+    compressed = wsola(samples, sample_rate, speed)
+    payload = np.clip(np.round(compressed), -32768, 32767).astype("<i2").tobytes()
+
+    part_file = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+    try:
+        write_concatenated([(fmt, payload)], part_file, "wav")
+        os.replace(part_file, target)
+    finally:
+        part_file.unlink(missing_ok=True)
+
+
+async def generate_time_compressed(
+    text: str,
+    config: dict,
+    speed: float,
+    client: AsyncOpenAI | None = None,
+    lane: str = INTERACTIVE,
+) -> Path:
+    """Return a cache entry for ``text`` spoken at ``speed``, creating it if needed."""
+    source = get_cache_file(text, config["voice"], config["instructions"], "wav", exact=True)
+    target = variant_file(source, speed)
+    if target.exists():
+        return target
+
+    source = await generate_and_cache_audio(
+        text, {**config, "response_format": "wav"}, client=client, exact_format=True, lane=lane
+    )
+    await asyncio.to_thread(time_compress_file, source, target, speed)
+    return target
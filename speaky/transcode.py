@@ -0,0 +1,171 @@
+"""Compact cache storage tier.
+
+Short spoken notifications are cached as full-bitrate MP3 by default. With
+``storage_format`` set to ``"opus"`` in the config, MP3 entries are
+transcoded in the background to low-bitrate Opus, which is several times
+smaller at speech quality. ``get_cache_file`` falls back to the Opus entry
+when the MP3 is gone, so lookups stay a single path check.
+
+Only the entries of spoken phrases, as recorded in the phrase history, are
+compacted. Parts and segments rendered with ``--output``, ``--batch`` or
+``--document`` are looked up in their exact format and stay MP3.
+
+Transcoding uses the ``ffmpeg`` executable, which must be on the PATH.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .cache import COMPACT_FORMAT, get_cache_file
+from .config import get_cache_dir
+from .history import load_history
+
+DEFAULT_BITRATE = "24k"
+LOCK_FILE_NAME = "compact.lock"
+# The lock is refreshed after every entry; one not refreshed for this long
+# belongs to a compaction that is stuck or was killed
+LOCK_TIMEOUT = 300.0
+
+
+def transcode_to_opus(mp3_file: Path, bitrate: str) -> Path:
+    """Transcode a cached MP3 entry to Opus and remove the MP3.
+
+    The Opus file is written under a temporary name and renamed into place,
+    so readers see either the MP3 or the complete Opus entry.
+    """
+    opus_file = mp3_file.with_suffix(f".{COMPACT_FORMAT}")
+    part_file = mp3_file.with_name(f".{opus_file.name}.{uuid.uuid4().hex}.part")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+                "-i", str(mp3_file),
+                "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+                "-f", "ogg", str(part_file),
+            ],
+            check=True,
+            capture_output=True,
+        )
+        os.replace(part_file, opus_file)
+    finally:
+        part_file.unlink(missing_ok=True)
+
+    try:
+        mp3_file.unlink()
+    except OSError:
+        # Still open for playback on platforms that forbid deleting open
+        # files; the next run removes it
+        pass
+    return opus_file
+
+
+def pending_entries(config: dict) -> list[Path]:
+    """Return the MP3 entries of spoken phrases that are not compacted yet."""
+    pending = []
+    for text in load_history():
+        mp3_file = get_cache_file(
+            text, config["voice"], config["instructions"], "mp3", exact=True
+        )
+        if not mp3_file.exists():
+            continue
+        if mp3_file.with_suffix(f".{COMPACT_FORMAT}").exists():
+            mp3_file.unlink(missing_ok=True)
+        else:
+            pending.append(mp3_file)
+    return pending
+
+
+def _process_alive(pid: int) -> bool:
+    if sys.platform == "win32":
+        # os.kill would terminate the process; rely on the lock's age
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _lock_is_stale(lock_file: Path) -> bool:
+    """Return True if ``lock_file`` was left by a dead or stuck compaction."""
+    try:
+        age = time.time() - lock_file.stat().st_mtime
+        content = lock_file.read_text()
+    except FileNotFoundError:
+        # Released in the meantime
+        return True
+    if age > LOCK_TIMEOUT:
+        return True
+    try:
+        pid = int(content)
+    except ValueError:
+        # The owner has not written its PID yet
+        return False
+    return not _process_alive(pid)
+
+
+def _acquire_lock(lock_file: Path) -> bool:
+    """Atomically take the compaction lock; return True if we got it."""
+    for _ in range(2):
+        try:
+            fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            if not _lock_is_stale(lock_file):
+                return False
+            lock_file.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, "w") as f:
+            f.write(str(os.getpid()))
+        return True
+    return False
+
+
+def compact_cache(config: dict) -> int:
+    """Transcode the pending MP3 entries of spoken phrases to Opus in a worker pool.
+
+    Only one compaction runs at a time per cache directory; if another is
+    in progress this returns immediately. A lock left by a process that
+    died, or not refreshed for ``LOCK_TIMEOUT`` seconds, is taken over.
+    Returns the number of entries transcoded.
+    """
+    if shutil.which("ffmpeg") is None:
+        print("❌ ffmpeg not found; cannot compact the cache")
+        return 0
+
+    cache_dir = get_cache_dir()
+    lock_file = cache_dir / LOCK_FILE_NAME
+    if not _acquire_lock(lock_file):
+        return 0
+
+    bitrate = config.get("storage_bitrate", DEFAULT_BITRATE)
+    compacted = 0
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = {
+                pool.submit(transcode_to_opus, mp3_file, bitrate): mp3_file
+                for mp3_file in pending_entries(config)
+            }
+            for future, mp3_file in futures.items():
+                try:
+                    future.result()
+                except (OSError, subprocess.CalledProcessError) as e:
+                    print(f"❌ Failed to compact {mp3_file.name}: {e}")
+                else:
+                    compacted += 1
+                # Show other processes this compaction is still alive
+                os.utime(lock_file)
+    finally:
+        lock_file.unlink(missing_ok=True)
+
+    print(f"✅ Compacted {compacted} cache entries")
+    return compacted
@@ -1,20 +1,30 @@
 """OpenAI TTS integration."""
 
+from __future__ import annotations
+
+import os
+import uuid
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+
 from openai import AsyncOpenAI
 from .cache import get_cache_file
+from .breaker import (
+    OUTAGE_ERRORS, before_request, record_failure, record_success, release_probe,
+)
+from .priority import wait_until_idle
+from .scheduler import BACKGROUND, INTERACTIVE, SynthesisScheduler
 
+# Every cache miss in this process is admitted through this scheduler
+scheduler = SynthesisScheduler()
+
+
+async def stream_speech(
+    text: str, config: dict, client: AsyncOpenAI | None = None
+) -> AsyncIterator[bytes]:
+    """Stream audio for ``text`` from the OpenAI TTS API, chunk by chunk."""
+    openai = client or AsyncOpenAI(api_key=config["api_key"])
 
-async def generate_and_cache_audio(text: str, config: dict):
-    """Generate audio using OpenAI TTS and save to cache."""
-    cache_file = get_cache_file(text, config["voice"], config["instructions"])
-    
-    # Return cached file if exists
-    if cache_file.exists():
-        return cache_file
-    
-    # Generate new audio
-    openai = AsyncOpenAI(api_key=config["api_key"])
-    
     async with openai.audio.speech.with_streaming_response.create(
         model=config["model"],
         voice=config["voice"],
@@ -22,9 +32,81 @@ async def generate_and_cache_audio(text: str, config: dict):
         instructions=config["instructions"],
         response_format=config["response_format"],
     ) as response:
-        # Save to cache file
-        with open(cache_file, "wb") as f:
-            async for chunk in response.iter_bytes():
-                f.write(chunk)
-    
-    return cache_file
\ No newline at end of file
+        async for chunk in response.iter_bytes():
+            yield chunk
+
+
+async def generate_and_cache_audio(
+    text: str,
+    config: dict,
+    on_chunk: Callable[[bytes], None] | None = None,
+    client: AsyncOpenAI | None = None,
+    exact_format: bool = False,
+    lane: str = INTERACTIVE,
+) -> Path:
+    """Generate audio using OpenAI TTS and save to cache.
+
+    Audio is streamed into a temporary file that is renamed into place once
+    complete, so concurrent readers never see a partial cache entry.
+    ``on_chunk``, if given, is called with each chunk as it is written.
+    ``client`` reuses an existing API client and its connections.
+    ``exact_format`` skips compacted entries (see ``get_cache_file``) for
+    callers that need audio in the configured format.
+
+    Misses wait for a slot in ``lane`` of the process-wide ``scheduler``,
+    so bulk work passes ``BACKGROUND`` to stay out of the way of speech
+    someone is waiting for. The scheduler only sees this process, so a
+    background miss also waits until no process holds a playback claim.
+
+    Misses go through the shared circuit breaker: while the API is known to
+    be down they raise ``CircuitOpenError`` without attempting a request.
+    """
+    cache_file = get_cache_file(
+        text,
+        config["voice"],
+        config["instructions"],
+        config.get("response_format", "mp3"),
+        exact=exact_format,
+    )
+
+    # Return cached file if exists
+    if cache_file.exists():
+        return cache_file
+
+    async with scheduler.slot(lane):
+        # Another request may have written the entry while this one waited
+        if cache_file.exists():
+            return cache_file
+
+        if lane == BACKGROUND:
+            # Yield to speech in any process, then check for an entry
+            # written meanwhile
+            await wait_until_idle()
+            if cache_file.exists():
+                return cache_file
+
+        # Generate new audio
+        probing = before_request(config)
+        part_file = cache_file.with_name(f".{cache_file.name}.{uuid.uuid4().hex}.part")
+        try:
+            with open(part_file, "wb") as f:
+                async for chunk in stream_speech(text, config, client):
+                    f.write(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+            os.replace(part_file, cache_file)
+        except OUTAGE_ERRORS:
+            part_file.unlink(missing_ok=True)
+            record_failure(config)
+            raise
+        except BaseException:
+            part_file.unlink(missing_ok=True)
+            raise
+        finally:
+            # A probe that failed for another reason (a rejected request,
+            # cancellation) must not block other processes until it expires
+            if probing:
+                release_probe()
+    record_success()
+
+    return cache_file
@@ -0,0 +1,14 @@
+"""Shared test fixtures."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep tests from writing to the real user cache directory."""
+    cache_root = tmp_path / "cache"
+    monkeypatch.setattr(
+        "speaky.config.platformdirs.user_cache_dir",
+        lambda appname: str(cache_root / appname),
+    )
+    return cache_root / "speaky"
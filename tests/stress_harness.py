@@ -0,0 +1,296 @@
+"""Concurrency stress and soak harness for the cache and playback paths.
+
+Not collected by pytest. Run it from the repository root:
+
+    python -m tests.stress_harness --processes 50 --duration 300
+
+The harness starts a local stub of the OpenAI speech endpoint and keeps
+``--processes`` real ``speaky`` invocations running against it for
+``--duration`` seconds. Each invocation gets an isolated ``HOME`` and
+``XDG_CACHE_HOME``, ``OPENAI_BASE_URL`` pointing at the stub, and the null
+audio sink (``SPEAKY_AUDIO_SINK=null``) instead of VLC. Phrases are
+drawn from a Zipf-like distribution, so popular phrases are requested by
+many processes at once, plus a share of never-seen phrases that keep the
+cache growing.
+
+At the end it reports invocation latency (p50/p99), API requests, how many
+phrases were synthesized more than once, cache entries whose content does
+not match what the stub sent, leftover ``.part`` files, and cache size over
+time. It exits with status 1 if it finds corrupt entries or leftover part
+files.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from speaky.cache import AUDIO_FORMATS, generate_cache_key
+from speaky.config import DEFAULT_CONFIG
+
+STUB_CHUNK_SIZE = 4096
+
+
+def stub_audio(text: str, size: int) -> bytes:
+    """Return the fake audio the stub sends for ``text``.
+
+    The content is derived from the text, so every cache entry can be
+    checked byte for byte.
+    """
+    digest = hashlib.md5(text.encode()).digest()
+    body = (digest * (size // len(digest) + 1))[:size]
+    return b"STUB" + body + b"END!"
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def format_size(size: float) -> str:
+    """Format a byte count for the report."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size:.0f} B"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+class StubTTS:
+    """A minimal stand-in for ``POST /v1/audio/speech``.
+
+    Audio is streamed in chunks after ``delay`` seconds. A ``failure_rate``
+    share of requests get a 500 response instead.
+    """
+
+    def __init__(self, audio_size: int, delay: float, failure_rate: float):
+        self.audio_size = audio_size
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self.failures = 0
+        self.served: Counter[str] = Counter()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            method, path = request_line.split(" ")[:2]
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+            length = int(headers.get("content-length", "0"))
+            body = await reader.readexactly(length) if length else b""
+
+            if method != "POST" or not path.endswith("/audio/speech"):
+                # Anything other than a speech request
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+
+            text = json.loads(body)["input"]
+            self.requests += 1
+            await asyncio.sleep(self.delay)
+            if random.random() < self.failure_rate:
+                self.failures += 1
+                error = json.dumps({"error": {"message": "stub failure"}}).encode()
+                writer.write(
+                    b"HTTP/1.1 500 Internal Server Error\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(error)}\r\nConnection: close\r\n\r\n".encode()
+                    + error
+                )
+                await writer.drain()
+                return
+
+            audio = stub_audio(text, self.audio_size)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: audio/mpeg\r\n"
+                + f"Content-Length: {len(audio)}\r\nConnection: close\r\n\r\n".encode()
+            )
+            for start in range(0, len(audio), STUB_CHUNK_SIZE):
+                writer.write(audio[start : start + STUB_CHUNK_SIZE])
+                await writer.drain()
+                await asyncio.sleep(0)
+            self.served[text] += 1
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, KeyError):
+            pass
+        finally:
+            writer.close()
+
+
+def cache_size(cache_dir: Path) -> int:
+    """Return the total size of the files in ``cache_dir``."""
+    total = 0
+    for path in cache_dir.rglob("*"):
+        try:
+            if path.is_file():
+                total += path.stat().st_size
+        except OSError:
+            pass
+    return total
+
+
+def check_cache(cache_dir: Path, texts: set[str], audio_size: int) -> dict:
+    """Compare every cache entry with the audio the stub sent for its text."""
+    expected = {
+        generate_cache_key(text, DEFAULT_CONFIG["voice"], DEFAULT_CONFIG["instructions"]): text
+        for text in texts
+    }
+    entries = corrupt = 0
+    for response_format in AUDIO_FORMATS:
+        for entry in cache_dir.glob(f"*.{response_format}"):
+            entries += 1
+            text = expected.get(entry.stem)
+            if text is None or entry.read_bytes() != stub_audio(text, audio_size):
+                corrupt += 1
+    return {
+        "entries": entries,
+        "corrupt": corrupt,
+        "part_files": len(list(cache_dir.glob(".*.part"))),
+    }
+
+
+async def invoke(text: str, env: dict) -> tuple[float, int, str]:
+    """Run one ``speaky`` invocation; return ``(seconds, returncode, output)``."""
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "speaky.main", text,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+    )
+    output, _ = await process.communicate()
+    return time.perf_counter() - start, process.returncode, output.decode(errors="replace")
+
+
+async def run(args: argparse.Namespace) -> int:
+    stub = StubTTS(args.audio_size, args.stub_delay, args.failure_rate)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    with tempfile.TemporaryDirectory(prefix="speaky-stress-") as root:
+        home = Path(root) / "home"
+        home.mkdir()
+        env = {
+            **os.environ,
+            "HOME": str(home),
+            "XDG_CACHE_HOME": str(Path(root) / "cache"),
+            "OPENAI_API_KEY": "stress-test",
+            "OPENAI_BASE_URL": f"http://127.0.0.1:{port}/v1",
+            "SPEAKY_AUDIO_SINK": "null",
+        }
+        cache_dir = Path(subprocess.run(
+            [sys.executable, "-c", "from speaky.config import get_cache_dir; print(get_cache_dir())"],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout.strip())
+
+        phrases = [f"Stress phrase number {i}." for i in range(args.phrases)]
+        weights = [1 / (rank + 1) for rank in range(args.phrases)]
+        texts: set[str] = set()
+        latencies: list[float] = []
+        errors: Counter[str] = Counter()
+        sizes = [(0.0, cache_size(cache_dir))]
+        started = time.monotonic()
+        deadline = started + args.duration
+
+        async def worker(worker_id: int):
+            fresh = 0
+            while time.monotonic() < deadline:
+                if random.random() < args.new_phrase_rate:
+                    fresh += 1
+                    text = f"Fresh phrase {worker_id}-{fresh}."
+                else:
+                    text = random.choices(phrases, weights)[0]
+                texts.add(text)
+                seconds, returncode, output = await invoke(text, env)
+                latencies.append(seconds)
+                if returncode != 0:
+                    lines = output.strip().splitlines()
+                    errors[lines[-1] if lines else f"exit {returncode}"] += 1
+
+        async def sample_sizes():
+            while True:
+                await asyncio.sleep(args.sample_interval)
+                sizes.append((time.monotonic() - started, cache_size(cache_dir)))
+
+        sampler = asyncio.create_task(sample_sizes())
+        async with server:
+            await asyncio.gather(*(worker(i) for i in range(args.processes)))
+        sampler.cancel()
+        elapsed = time.monotonic() - started
+        sizes.append((elapsed, cache_size(cache_dir)))
+
+        check = check_cache(cache_dir, texts, args.audio_size)
+
+    duplicates = {text: count - 1 for text, count in stub.served.items() if count > 1}
+    growth = (sizes[-1][1] - sizes[0][1]) / (elapsed / 60)
+    report = {
+        "invocations": len(latencies),
+        "failed_invocations": sum(errors.values()),
+        "latency_p50": percentile(latencies, 0.50) if latencies else None,
+        "latency_p99": percentile(latencies, 0.99) if latencies else None,
+        "api_requests": stub.requests,
+        "api_failures": stub.failures,
+        "duplicate_syntheses": sum(duplicates.values()),
+        "duplicated_phrases": len(duplicates),
+        **check,
+        "cache_bytes_start": sizes[0][1],
+        "cache_bytes_end": sizes[-1][1],
+        "cache_bytes_max": max(size for _, size in sizes),
+        "cache_growth_per_minute": growth,
+        "errors": dict(errors.most_common(5)),
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Invocations:          {report['invocations']} ({report['failed_invocations']} failed) in {elapsed:.0f}s")
+        if latencies:
+            print(f"Latency p50/p99:      {report['latency_p50']:.3f}s / {report['latency_p99']:.3f}s")
+        print(f"API requests:         {stub.requests} ({stub.failures} failed by the stub)")
+        print(f"Duplicate syntheses:  {report['duplicate_syntheses']} across {len(duplicates)} phrases")
+        print(f"Cache entries:        {check['entries']} ({check['corrupt']} corrupt)")
+        print(f"Leftover part files:  {check['part_files']}")
+        print(
+            f"Cache size:           {format_size(sizes[0][1])} -> {format_size(sizes[-1][1])} "
+            f"(max {format_size(report['cache_bytes_max'])}, {format_size(growth)}/min)"
+        )
+        for message, count in errors.most_common(5):
+            print(f"  {count} x {message}")
+
+    return 1 if check["corrupt"] or check["part_files"] else 0
+
+
+def parse_arguments(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Stress and soak test concurrent speaky invocations against a local stub",
+        prog="python -m tests.stress_harness",
+    )
+    parser.add_argument("--processes", type=int, default=50, help="Concurrent invocations (default: 50)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep launching invocations (default: 30)")
+    parser.add_argument("--phrases", type=int, default=20, help="Size of the shared phrase pool (default: 20)")
+    parser.add_argument("--new-phrase-rate", type=float, default=0.1, help="Share of invocations with a never-seen phrase (default: 0.1)")
+    parser.add_argument("--audio-size", type=int, default=32 * 1024, help="Bytes of audio per phrase (default: 32768)")
+    parser.add_argument("--stub-delay", type=float, default=0.2, help="Seconds the stub waits before answering (default: 0.2)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of API requests the stub fails with a 500 (default: 0)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between cache size samples (default: 1)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(run(parse_arguments())))
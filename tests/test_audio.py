@@ -5,7 +5,7 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 import pytest
 
-from speaky.audio import play_audio_file
+from speaky.audio import play_audio_file, create_vlc_instance
 
 
 class TestPlayAudioFile:
@@ -143,4 +143,106 @@ class TestPlayAudioFile:
         play_audio_file(test_path)
         
         # Verify
-        mock_vlc.MediaPlayer.assert_called_once_with(test_path)
\ No newline at end of file
+        mock_vlc.MediaPlayer.assert_called_once_with(test_path)
+    
+    @patch('speaky.audio.vlc')
+    @patch('speaky.audio.time.sleep')
+    def test_play_audio_file_preempted(self, mock_sleep, mock_vlc):
+        """Test playback stops when a higher-priority message starts."""
+        # Setup
+        mock_player = MagicMock()
+        mock_vlc.MediaPlayer.return_value = mock_player
+        mock_player.get_state.return_value = mock_vlc.State.Playing
+        mock_claim = MagicMock()
+        mock_claim.outranked.side_effect = [False, True]
+        
+        # Execute
+        play_audio_file("/test/file.mp3", claim=mock_claim)
+        
+        # Verify
+        assert mock_claim.outranked.call_count == 2
+        mock_player.stop.assert_called_once()
+        mock_player.release.assert_called_once()
+    
+    @patch('speaky.audio.vlc')
+    @patch('speaky.audio.time.sleep')
+    def test_play_audio_file_ducked(self, mock_sleep, mock_vlc):
+        """Test playback ducks while outranked and restores volume afterwards."""
+        # Setup
+        mock_player = MagicMock()
+        mock_vlc.MediaPlayer.return_value = mock_player
+        mock_player.get_state.side_effect = [
+            mock_vlc.State.Playing,
+            mock_vlc.State.Playing,
+            mock_vlc.State.Playing,
+            mock_vlc.State.Ended
+        ]
+        mock_claim = MagicMock()
+        mock_claim.outranked.side_effect = [True, True, False]
+        
+        # Execute
+        play_audio_file("/test/file.mp3", claim=mock_claim, preempt_mode="duck")
+        
+        # Verify
+        assert [c.args for c in mock_player.audio_set_volume.call_args_list] == [(30,), (100,)]
+        assert mock_player.get_state.call_count == 4
+    
+    @patch('speaky.audio.vlc')
+    @patch('speaky.audio.time.sleep')
+    def test_play_audio_file_with_instance(self, mock_sleep, mock_vlc):
+        """Test play_audio_file uses a pre-initialized VLC instance."""
+        # Setup
+        mock_instance = MagicMock()
+        mock_player = mock_instance.media_player_new.return_value
+        mock_player.get_state.return_value = mock_vlc.State.Ended
+        
+        # Execute
+        play_audio_file("/test/file.mp3", mock_instance)
+        
+        # Verify
+        mock_instance.media_player_new.assert_called_once_with("/test/file.mp3")
+        mock_vlc.MediaPlayer.assert_not_called()
+        mock_player.play.assert_called_once()
+        mock_player.release.assert_called_once()
+
+    
+    @patch('speaky.audio.vlc')
+    def test_play_audio_file_null_sink(self, mock_vlc, monkeypatch, tmp_path):
+        """Test the null audio sink reads the file without touching VLC."""
+        # Setup
+        monkeypatch.setenv("SPEAKY_AUDIO_SINK", "null")
+        audio_file = tmp_path / "file.mp3"
+        audio_file.write_bytes(b"audio")
+        
+        # Execute
+        play_audio_file(audio_file)
+        
+        # Verify
+        mock_vlc.MediaPlayer.assert_not_called()
+        with pytest.raises(FileNotFoundError):
+            play_audio_file(tmp_path / "missing.mp3")
+
+
+class TestCreateVlcInstance:
+    """Tests for create_vlc_instance function."""
+    
+    @patch('speaky.audio.vlc')
+    def test_create_vlc_instance(self, mock_vlc):
+        """Test create_vlc_instance returns a libVLC instance."""
+        assert create_vlc_instance() == mock_vlc.Instance.return_value
+    
+    @patch('speaky.audio.vlc')
+    def test_create_vlc_instance_failure(self, mock_vlc):
+        """Test create_vlc_instance raises when libVLC cannot be loaded."""
+        mock_vlc.Instance.return_value = None
+        
+        with pytest.raises(RuntimeError):
+            create_vlc_instance()
+    
+    @patch('speaky.audio.vlc')
+    def test_create_vlc_instance_null_sink(self, mock_vlc, monkeypatch):
+        """Test create_vlc_instance skips libVLC with the null audio sink."""
+        monkeypatch.setenv("SPEAKY_AUDIO_SINK", "null")
+        
+        assert create_vlc_instance() is None
+        mock_vlc.Instance.assert_not_called()
@@ -0,0 +1,137 @@
+"""Tests for breaker module."""
+
+import os
+import time
+import pytest
+
+from speaky import breaker
+from speaky.breaker import (
+    CircuitOpenError,
+    before_request,
+    record_failure,
+    record_success,
+    release_probe,
+)
+
+CONFIG = {"breaker_threshold": 2, "breaker_cooldown": 60}
+
+
+def open_circuit(opened_at=None):
+    """Record enough failures to open the circuit."""
+    for _ in range(CONFIG["breaker_threshold"]):
+        record_failure(CONFIG)
+    if opened_at is not None:
+        breaker._save_state({"failures": 2, "opened_at": opened_at})
+
+
+class TestCircuitBreaker:
+    """Tests for the shared circuit breaker."""
+
+    def test_closed_by_default(self):
+        """Test that requests are allowed with no recorded failures."""
+        before_request(CONFIG)
+
+    def test_stays_closed_below_threshold(self):
+        """Test that failures below the threshold keep the circuit closed."""
+        record_failure(CONFIG)
+
+        before_request(CONFIG)
+
+    def test_opens_at_threshold(self):
+        """Test that consecutive failures open the circuit."""
+        open_circuit()
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            before_request(CONFIG)
+
+        assert "retrying in" in str(exc_info.value)
+
+    def test_success_resets_failures(self):
+        """Test that a success clears earlier failures."""
+        record_failure(CONFIG)
+        record_success()
+        record_failure(CONFIG)
+
+        before_request(CONFIG)
+
+    def test_state_is_shared_through_file(self, isolated_cache_dir):
+        """Test that the circuit state is persisted in the cache directory."""
+        open_circuit()
+
+        assert (isolated_cache_dir / breaker.BREAKER_FILE_NAME).exists()
+
+    def test_half_open_allows_single_probe(self):
+        """Test that after the cooldown exactly one caller is let through."""
+        open_circuit(opened_at=time.time() - 120)
+
+        before_request(CONFIG)
+        with pytest.raises(CircuitOpenError) as exc_info:
+            before_request(CONFIG)
+
+        assert "another process" in str(exc_info.value)
+
+    def test_probe_success_closes_circuit(self):
+        """Test that a successful probe closes the circuit for everyone."""
+        open_circuit(opened_at=time.time() - 120)
+        before_request(CONFIG)
+
+        record_success()
+
+        before_request(CONFIG)
+        before_request(CONFIG)
+
+    def test_probe_failure_reopens_circuit(self):
+        """Test that a failed probe starts a new cooldown."""
+        open_circuit(opened_at=time.time() - 120)
+        before_request(CONFIG)
+
+        record_failure(CONFIG)
+
+        with pytest.raises(CircuitOpenError) as exc_info:
+            before_request(CONFIG)
+        assert "retrying in" in str(exc_info.value)
+
+    def test_stale_probe_is_replaced(self, isolated_cache_dir):
+        """Test that a probe that never reported back does not block forever."""
+        open_circuit(opened_at=time.time() - 120)
+        before_request(CONFIG)
+        probe_file = isolated_cache_dir / breaker.PROBE_FILE_NAME
+        stale = time.time() - breaker.PROBE_TIMEOUT - 1
+        os.utime(probe_file, (stale, stale))
+
+        before_request(CONFIG)
+
+    def test_corrupt_state_file(self, isolated_cache_dir):
+        """Test that an unreadable state file counts as a closed circuit."""
+        isolated_cache_dir.mkdir(parents=True, exist_ok=True)
+        (isolated_cache_dir / breaker.BREAKER_FILE_NAME).write_text("{oops")
+
+        before_request(CONFIG)
+
+    @pytest.mark.parametrize("content", ['[1, 2]', '{"failures": "3"}', '{"failures": 3, "opened_at": "now"}'])
+    def test_malformed_state_file(self, isolated_cache_dir, content):
+        """Test that a state file of the wrong shape counts as a closed circuit."""
+        isolated_cache_dir.mkdir(parents=True, exist_ok=True)
+        (isolated_cache_dir / breaker.BREAKER_FILE_NAME).write_text(content)
+
+        assert before_request(CONFIG) is False
+
+    def test_lowered_threshold_opens_circuit_now(self):
+        """Test that failures counted under a higher threshold open the circuit."""
+        # Setup
+        record_failure({"breaker_threshold": 5})
+        record_failure({"breaker_threshold": 5})
+
+        # Execute & Verify
+        with pytest.raises(CircuitOpenError) as exc_info:
+            before_request(CONFIG)
+        assert "retrying in 60s" in str(exc_info.value)
+        assert breaker._load_state()["opened_at"] is not None
+
+    def test_probe_is_reported_to_caller(self):
+        """Test that only the request let through as the probe is told so."""
+        open_circuit(opened_at=time.time() - 120)
+
+        assert before_request(CONFIG) is True
+        release_probe()
+        assert before_request(CONFIG) is True
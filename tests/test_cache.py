@@ -89,6 +89,40 @@ class TestGetCacheFile:
             # Verify
             assert path1 == path2
 
+    @patch('speaky.cache.get_cache_dir')
+    def test_get_cache_file_response_format(self, mock_get_cache_dir):
+        """Test get_cache_file uses the response format as the extension."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir)
+            mock_get_cache_dir.return_value = cache_dir
+            
+            # Execute
+            mp3_path = get_cache_file("test", "nova", "instructions")
+            wav_path = get_cache_file("test", "nova", "instructions", "wav")
+            
+            # Verify
+            assert wav_path.suffix == ".wav"
+            assert wav_path.stem == mp3_path.stem
+
+    
+    @patch('speaky.cache.get_cache_dir')
+    def test_get_cache_file_compacted_entry(self, mock_get_cache_dir):
+        """Test get_cache_file returns the compact entry once the MP3 is gone."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = Path(temp_dir)
+            mock_get_cache_dir.return_value = cache_dir
+            mp3_path = get_cache_file("test", "nova", "instructions")
+            mp3_path.with_suffix(".opus").touch()
+            
+            # Execute
+            result = get_cache_file("test", "nova", "instructions")
+            exact = get_cache_file("test", "nova", "instructions", exact=True)
+            
+            # Verify
+            assert result == mp3_path.with_suffix(".opus")
+            assert exact == mp3_path
 
 class TestClearCache:
     """Tests for clear_cache function."""
@@ -104,10 +138,12 @@ class TestClearCache:
             # Create test files
             mp3_file1 = cache_dir / "test1.mp3"
             mp3_file2 = cache_dir / "test2.mp3"
+            wav_file = cache_dir / "test3.wav"
             other_file = cache_dir / "test.txt"
             
             mp3_file1.touch()
             mp3_file2.touch()
+            wav_file.touch()
             other_file.touch()
             
             # Execute
@@ -116,6 +152,7 @@ class TestClearCache:
             # Verify
             assert not mp3_file1.exists()
             assert not mp3_file2.exists()
+            assert not wav_file.exists()
             assert other_file.exists()  # Non-mp3 files should remain
             
             # Check output message
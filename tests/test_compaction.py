@@ -0,0 +1,151 @@
+"""Tests for compaction module."""
+
+import pytest
+
+from speaky.compaction import (
+    compact_text,
+    compaction_settings,
+    collapse_repeats,
+    cut_to_budget,
+    DEFAULT_COMPACTION,
+)
+
+ENABLED = {"compaction": True}
+
+
+class TestCompactionSettings:
+    """Tests for compaction_settings function."""
+
+    def test_disabled_by_default(self):
+        """Test that compaction is off without a config key."""
+        assert compaction_settings({}) is None
+        assert compaction_settings({"compaction": False}) is None
+
+    def test_enabled_with_defaults(self):
+        """Test that true enables every step."""
+        assert compaction_settings(ENABLED) == DEFAULT_COMPACTION
+
+    def test_overrides(self):
+        """Test that a dict overrides individual steps."""
+        settings = compaction_settings({"compaction": {"urls": False, "max_chars": 50}})
+
+        assert settings == {**DEFAULT_COMPACTION, "urls": False, "max_chars": 50}
+
+    def test_unknown_option(self):
+        """Test that a misspelled option is rejected."""
+        with pytest.raises(ValueError) as exc_info:
+            compaction_settings({"compaction": {"url": False}})
+
+        assert "url" in str(exc_info.value)
+
+
+class TestCompactText:
+    """Tests for compact_text function."""
+
+    def test_disabled_leaves_text_unchanged(self):
+        """Test that text passes through untouched when compaction is off."""
+        text = "Failed at /home/user/app/main.py  twice"
+
+        assert compact_text(text, {}) == text
+
+    def test_paths_shortened_to_basename(self):
+        """Test that absolute, relative and Windows paths become basenames."""
+        text = r"Edited /home/user/app/main.py, src/speaky/cache.py and C:\repo\docs\cli.md"
+
+        assert compact_text(text, ENABLED) == "Edited main.py, cache.py and cli.md"
+
+    def test_slash_words_kept(self):
+        """Test that words joined by a slash are not treated as paths."""
+        assert compact_text("Use the read/write and/or flags", ENABLED) == "Use the read/write and/or flags"
+
+    def test_hashes_and_urls_dropped(self):
+        """Test that hashes, UUIDs and URLs are removed and gaps tidied."""
+        text = (
+            "Deploy 3f2a9c1d failed (run 0b9f2c3e-1234-4abc-8def-0123456789ab). "
+            "See https://ci.example.com/builds/123 for details."
+        )
+
+        assert compact_text(text, ENABLED) == "Deploy failed (run). See for details."
+
+    @pytest.mark.parametrize("text, expected", [
+        ("See https://example.com/x. Then retry.", "See. Then retry."),
+        ("Docs (https://example.com/a?b=c), then go!", "Docs, then go!"),
+        ("Is it up at www.example.com? Yes", "Is it up at? Yes"),
+    ])
+    def test_url_keeps_trailing_punctuation(self, text, expected):
+        """Test that sentence punctuation after a URL is not dropped with it."""
+        assert compact_text(text, ENABLED) == expected
+
+    def test_hex_words_kept(self):
+        """Test that ordinary words made of hex letters are not dropped."""
+        assert compact_text("The facade was defaced", ENABLED) == "The facade was defaced"
+
+    @pytest.mark.parametrize("text", [
+        "Processed 1234567 records in 3.14159265 seconds",
+        "Build 20261019 finished",
+        "Started at 1760870400",
+        "Pi is 3.1415926e0 roughly",
+    ])
+    def test_numbers_kept(self, text):
+        """Test that counts, dates, timestamps and decimals are not taken for hashes."""
+        assert compact_text(text, ENABLED) == text
+
+    def test_hash_needs_letter_and_digit(self):
+        """Test that a hex run is dropped only when it mixes letters and digits."""
+        assert compact_text("Commit 9c0ffee1 and 12345678 builds", ENABLED) == "Commit and 12345678 builds"
+
+    def test_repeated_lines_collapsed(self):
+        """Test that repeated log lines are spoken once."""
+        text = "Retrying connection\nRetrying connection\nRetrying connection\nGave up"
+
+        assert compact_text(text, ENABLED) == "Retrying connection Gave up"
+
+    def test_steps_can_be_disabled(self):
+        """Test that a disabled step leaves its tokens in place."""
+        config = {"compaction": {"urls": False}}
+
+        assert compact_text("See https://example.com now", config) == "See https://example.com now"
+
+    def test_noise_only_message_kept(self):
+        """Test that a message that is all noise is still spoken."""
+        assert compact_text("https://example.com", ENABLED) == "https://example.com"
+
+    def test_budget_applied(self):
+        """Test that the result is cut to the character budget."""
+        config = {"compaction": {"max_chars": 40}}
+
+        result = compact_text("First sentence is here. Second sentence is longer.", config)
+
+        assert result == "First sentence is here."
+
+
+class TestCollapseRepeats:
+    """Tests for collapse_repeats function."""
+
+    def test_only_consecutive_repeats(self):
+        """Test that a line repeated later, after other lines, is kept."""
+        assert collapse_repeats("a\na\nb\na") == "a\nb\na"
+
+
+class TestCutToBudget:
+    """Tests for cut_to_budget function."""
+
+    def test_short_text_unchanged(self):
+        """Test that text within the budget is unchanged."""
+        assert cut_to_budget("Short.", 10) == "Short."
+
+    def test_cut_at_sentence(self):
+        """Test that the cut prefers a sentence end."""
+        assert cut_to_budget("One two three. Four five six seven.", 25) == "One two three."
+
+    def test_cut_at_clause(self):
+        """Test that the cut falls back to a clause end."""
+        assert cut_to_budget("One two three, four five six seven", 25) == "One two three"
+
+    def test_cut_at_word(self):
+        """Test that the cut falls back to a word boundary."""
+        assert cut_to_budget("One two three four five six seven", 25) == "One two three four five"
+
+    def test_early_sentence_end_ignored(self):
+        """Test that a sentence end in the first half of the budget is not used."""
+        assert cut_to_budget("Hi. One two three four five six", 25) == "Hi. One two three four"
@@ -7,7 +7,13 @@ from pathlib import Path
 from unittest.mock import patch, MagicMock
 import pytest
 
-from speaky.config import get_cache_dir, load_config, install_default_config, DEFAULT_CONFIG
+from speaky.config import (
+    get_cache_dir,
+    load_config,
+    install_default_config,
+    DEFAULT_CONFIG,
+    SNAPSHOT_FILE_NAME,
+)
 
 
 class TestGetCacheDir:
@@ -64,7 +70,7 @@ class TestLoadConfig:
             "response_format": "mp3"
         }
         assert config == expected_config
-        mock_load_dotenv.assert_called_once()
+        mock_load_dotenv.assert_not_called()
 
     @patch.dict(os.environ, {'OPENAI_API_KEY': 'test-api-key'})
     @patch('speaky.config.load_dotenv')
@@ -88,13 +94,16 @@ class TestLoadConfig:
     @patch.dict(os.environ, {}, clear=True)
     @patch('speaky.config.USER_CONFIG_PATH', Path("/nonexistent/.speaky.json"))
     @patch('speaky.config.load_dotenv')
-    def test_load_config_missing_api_key(self, mock_load_dotenv):
+    def test_load_config_missing_api_key(self, mock_load_dotenv, tmp_path, monkeypatch):
         """Test configuration loading fails with missing API key."""
+        (tmp_path / ".env").write_text("OTHER=value\n")
+        monkeypatch.chdir(tmp_path)
+
         with pytest.raises(ValueError) as exc_info:
             load_config()
 
         assert "OPENAI_API_KEY not found" in str(exc_info.value)
-        mock_load_dotenv.assert_called_once()
+        mock_load_dotenv.assert_called_once_with(tmp_path / ".env")
 
     @patch.dict(os.environ, {'OPENAI_API_KEY': ''})
     @patch('speaky.config.USER_CONFIG_PATH', Path("/nonexistent/.speaky.json"))
@@ -107,6 +116,110 @@ class TestLoadConfig:
         assert "OPENAI_API_KEY not found" in str(exc_info.value)
 
 
+class TestConfigSnapshot:
+    """Tests for the resolved config snapshot."""
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test-api-key'})
+    def test_unchanged_config_not_reparsed(self, tmp_path):
+        """Test that the snapshot is used while the config file is unchanged."""
+        # Setup
+        config_path = tmp_path / ".speaky.json"
+        config_path.write_text(json.dumps({"voice": "alloy"}))
+
+        with patch('speaky.config.USER_CONFIG_PATH', config_path):
+            load_config()
+
+            # Same size and mtime: indistinguishable without reading the file
+            stat = config_path.stat()
+            config_path.write_text(json.dumps({"voice": "coral"}))
+            os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+            # Execute
+            cached = load_config()
+
+            os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+            reloaded = load_config()
+
+        # Verify
+        assert cached["voice"] == "alloy"
+        assert reloaded["voice"] == "coral"
+
+    def test_snapshot_has_no_secrets(self, tmp_path, monkeypatch):
+        """Test that the API key from .env is not written to the snapshot."""
+        # Setup
+        (tmp_path / ".env").write_text("OPENAI_API_KEY=dotenv-secret\n")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+        # Execute
+        with patch('speaky.config.USER_CONFIG_PATH', tmp_path / ".speaky.json"):
+            config = load_config()
+        monkeypatch.delenv("OPENAI_API_KEY")
+
+        # Verify
+        assert config["api_key"] == "dotenv-secret"
+        snapshot = (get_cache_dir() / SNAPSHOT_FILE_NAME).read_text()
+        assert "dotenv-secret" not in snapshot
+        assert str(tmp_path / ".env") in snapshot
+
+    @patch.dict(os.environ, {}, clear=True)
+    @patch('speaky.config.load_dotenv')
+    def test_new_dotenv_found(self, mock_load_dotenv, tmp_path, monkeypatch):
+        """Test that a .env added closer to the working directory is picked up."""
+        # Setup
+        work_dir = tmp_path / "project" / "src"
+        work_dir.mkdir(parents=True)
+        (tmp_path / ".env").write_text("OTHER=value\n")
+        monkeypatch.chdir(work_dir)
+
+        with patch('speaky.config.USER_CONFIG_PATH', tmp_path / ".speaky.json"):
+            with pytest.raises(ValueError):
+                load_config()
+
+            # Execute
+            (tmp_path / "project" / ".env").write_text("OTHER=value\n")
+            with pytest.raises(ValueError):
+                load_config()
+
+        # Verify
+        assert mock_load_dotenv.call_args_list[0].args == (tmp_path / ".env",)
+        assert mock_load_dotenv.call_args_list[1].args == (tmp_path / "project" / ".env",)
+
+    @patch.dict(os.environ, {
+        'OPENAI_API_KEY': 'test-api-key',
+        'SPEAKY_VOICE': 'echo',
+        'SPEAKY_MODEL': 'tts-1',
+        'SPEAKY_RESPONSE_FORMAT': 'wav',
+    })
+    @patch('speaky.config.USER_CONFIG_PATH', Path("/nonexistent/.speaky.json"))
+    def test_environment_overrides(self):
+        """Test that SPEAKY_* variables override the config file."""
+        config = load_config()
+
+        assert config["voice"] == "echo"
+        assert config["model"] == "tts-1"
+        assert config["response_format"] == "wav"
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test-api-key', 'SPEAKY_VOICE': 'echo'})
+    @patch('speaky.config.USER_CONFIG_PATH', Path("/nonexistent/.speaky.json"))
+    def test_environment_overrides_ignored(self):
+        """Test that the file config can be loaded without SPEAKY_* overrides."""
+        config = load_config(overrides=False)
+
+        assert config["voice"] == DEFAULT_CONFIG["voice"]
+        assert config["api_key"] == "test-api-key"
+
+    @patch.dict(os.environ, {'OPENAI_API_KEY': 'test-api-key'})
+    def test_installs_default_config(self, tmp_path):
+        """Test that a missing config file is created with the defaults."""
+        config_path = tmp_path / ".speaky.json"
+
+        with patch('speaky.config.USER_CONFIG_PATH', config_path):
+            load_config()
+
+        assert json.loads(config_path.read_text()) == DEFAULT_CONFIG
+
+
 class TestInstallDefaultConfig:
     """Tests for install_default_config function."""
 
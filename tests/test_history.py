@@ -0,0 +1,227 @@
+"""Tests for history module."""
+
+import os
+import threading
+import time
+from unittest.mock import patch, AsyncMock
+import pytest
+
+from speaky import history
+from speaky.cache import get_cache_file
+from speaky.config import get_cache_dir
+from speaky.timescale import variant_file
+from speaky.history import (
+    phrase_score,
+    load_history,
+    record_phrase,
+    top_phrases,
+    fingerprint_changed,
+    rewarm_cache,
+)
+
+CONFIG = {
+    "api_key": "test-key",
+    "model": "gpt-4o-mini-tts",
+    "voice": "nova",
+    "instructions": "test instructions",
+    "response_format": "mp3",
+    "rewarm_interval": 0,
+}
+
+
+class TestPhraseScore:
+    """Tests for phrase_score function."""
+
+    def test_recent_phrase_keeps_full_count(self):
+        """Test that a phrase spoken just now scores its raw count."""
+        now = time.time()
+        assert phrase_score(4, now, now) == 4
+
+    def test_score_halves_after_half_life(self):
+        """Test that the score decays by half every half-life."""
+        now = time.time()
+        score = phrase_score(4, now - history.HALF_LIFE_SECONDS, now)
+        assert score == pytest.approx(2)
+
+
+class TestRecordPhrase:
+    """Tests for record_phrase and top_phrases functions."""
+
+    def test_record_phrase_counts_repeats(self):
+        """Test that repeated phrases accumulate a count."""
+        record_phrase("Build passed")
+        record_phrase("Build passed")
+        record_phrase("Tests failed")
+
+        entries = load_history()
+        assert entries["Build passed"][0] == 2
+        assert entries["Tests failed"][0] == 1
+
+    def test_top_phrases_ranks_by_frequency(self):
+        """Test that the most frequent phrases come first."""
+        for _ in range(3):
+            record_phrase("often")
+        record_phrase("once")
+
+        assert top_phrases(1) == ["often"]
+        assert top_phrases(5) == ["often", "once"]
+
+    def test_history_is_bounded(self):
+        """Test that history keeps at most MAX_HISTORY_ENTRIES phrases."""
+        with patch.object(history, "MAX_HISTORY_ENTRIES", 2):
+            record_phrase("a")
+            record_phrase("a")
+            record_phrase("b")
+            record_phrase("c")
+
+            assert len(load_history()) == 2
+            assert "a" in load_history()
+
+    def test_concurrent_writers_keep_every_count(self):
+        """Test that phrases recorded from several threads are all counted."""
+        # Setup
+        threads = [
+            threading.Thread(target=lambda: [record_phrase("busy") for _ in range(10)])
+            for _ in range(4)
+        ]
+
+        # Execute
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Verify
+        assert load_history()["busy"][0] == 40
+        assert not (get_cache_dir() / history.HISTORY_LOCK_NAME).exists()
+
+    def test_held_lock_skips_recording(self):
+        """Test that a phrase is not recorded while another writer holds the lock."""
+        # Setup
+        (get_cache_dir() / history.HISTORY_LOCK_NAME).touch()
+
+        # Execute
+        with patch.object(history, "LOCK_WAIT", 0.05):
+            record_phrase("skipped")
+
+        # Verify
+        assert load_history() == {}
+
+    def test_stale_lock_is_taken_over(self):
+        """Test that a lock left by a dead process does not block recording."""
+        # Setup
+        lock_file = get_cache_dir() / history.HISTORY_LOCK_NAME
+        lock_file.touch()
+        old = time.time() - history.LOCK_TIMEOUT - 1
+        os.utime(lock_file, (old, old))
+
+        # Execute
+        record_phrase("recorded")
+
+        # Verify
+        assert load_history()["recorded"][0] == 1
+        assert not lock_file.exists()
+
+    def test_load_history_corrupt_file(self, isolated_cache_dir):
+        """Test that a corrupt history file is treated as empty."""
+        isolated_cache_dir.mkdir(parents=True, exist_ok=True)
+        (isolated_cache_dir / history.HISTORY_FILE_NAME).write_text("{not json")
+
+        assert load_history() == {}
+
+
+class TestFingerprintChanged:
+    """Tests for fingerprint_changed function."""
+
+    def test_first_run_is_not_a_change(self):
+        """Test that storing the first fingerprint reports no change."""
+        assert not fingerprint_changed(CONFIG)
+
+    def test_same_config_is_not_a_change(self):
+        """Test that an unchanged config reports no change."""
+        fingerprint_changed(CONFIG)
+        assert not fingerprint_changed(CONFIG)
+
+    def test_voice_change_is_detected_once(self):
+        """Test that a voice change is reported once and then remembered."""
+        fingerprint_changed(CONFIG)
+        new_config = {**CONFIG, "voice": "alloy"}
+
+        assert fingerprint_changed(new_config)
+        assert not fingerprint_changed(new_config)
+
+    def test_model_change_is_ignored(self):
+        """Test that settings outside the cache key do not count as a change."""
+        fingerprint_changed(CONFIG)
+        assert not fingerprint_changed({**CONFIG, "model": "tts-1"})
+
+
+    def test_speed_change_is_detected(self):
+        """Test that a new playback speed counts as a change, as it is a different entry."""
+        fingerprint_changed(CONFIG)
+
+        assert fingerprint_changed({**CONFIG, "playback_speed": 1.5})
+        assert fingerprint_changed({**CONFIG, "playback_speed": 1.0})
+
+
+class TestRewarmCache:
+    """Tests for rewarm_cache function."""
+
+    @patch('speaky.history.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_rewarm_synthesizes_top_phrases(self, mock_generate):
+        """Test that rewarm synthesizes the top N phrases."""
+        for text in ["one", "two", "three"]:
+            record_phrase(text)
+
+        warmed = await rewarm_cache({**CONFIG, "rewarm_top_n": 2})
+
+        assert warmed == 2
+        assert mock_generate.call_count == 2
+
+    @patch('speaky.history.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_rewarm_skips_cached_phrases(self, mock_generate):
+        """Test that phrases already in the cache are not re-synthesized."""
+        record_phrase("cached")
+        record_phrase("missing")
+
+        get_cache_file(
+            "cached", CONFIG["voice"], CONFIG["instructions"], CONFIG["response_format"]
+        ).touch()
+
+        warmed = await rewarm_cache(CONFIG)
+
+        assert warmed == 1
+        mock_generate.assert_called_once_with("missing", CONFIG, lane="background")
+
+    @patch('speaky.history.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_rewarm_continues_after_error(self, mock_generate, capsys):
+        """Test that one failed phrase does not stop the worker."""
+        record_phrase("bad")
+        record_phrase("good")
+        mock_generate.side_effect = [Exception("API Error"), None]
+
+        warmed = await rewarm_cache(CONFIG)
+
+        assert warmed == 1
+        assert "❌ Failed to re-warm" in capsys.readouterr().out
+
+    @patch('speaky.history.generate_time_compressed', new_callable=AsyncMock)
+    @patch('speaky.history.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_rewarm_at_playback_speed(self, mock_generate, mock_compressed):
+        """Test that with a playback speed the time-compressed variants are warmed."""
+        config = {**CONFIG, "playback_speed": 1.5}
+        record_phrase("cached")
+        record_phrase("missing")
+        variant_file(
+            get_cache_file("cached", CONFIG["voice"], CONFIG["instructions"], "wav", exact=True), 1.5
+        ).touch()
+
+        warmed = await rewarm_cache(config)
+
+        assert warmed == 1
+        mock_compressed.assert_called_once_with("missing", config, 1.5, lane="background")
+        mock_generate.assert_not_called()
@@ -0,0 +1,56 @@
+"""Tests for hook module."""
+
+from speaky.hook import extract_field, sanitize_text
+
+
+class TestExtractField:
+    """Tests for extract_field function."""
+
+    def test_top_level_field(self):
+        """Test extracting a top-level string field."""
+        assert extract_field('{"message": "Hello"}', "message") == "Hello"
+
+    def test_nested_field(self):
+        """Test extracting a field by dotted path."""
+        payload = '{"tool_input": {"command": "make test"}}'
+
+        assert extract_field(payload, "tool_input.command") == "make test"
+
+    def test_scalar_values(self):
+        """Test that numbers and booleans are spoken as text."""
+        assert extract_field('{"count": 3}', "count") == "3"
+        assert extract_field('{"ok": true}', "ok") == "true"
+
+    def test_missing_field(self):
+        """Test that a missing field gives None."""
+        assert extract_field('{"title": "Hi"}', "message") is None
+        assert extract_field('{"a": "text"}', "a.b") is None
+
+    def test_non_scalar_value(self):
+        """Test that objects, lists and null are not spoken."""
+        assert extract_field('{"message": {"text": "Hi"}}', "message") is None
+        assert extract_field('{"message": null}', "message") is None
+
+    def test_invalid_json(self):
+        """Test that a payload that is not JSON gives None."""
+        assert extract_field("not json", "message") is None
+
+
+class TestSanitizeText:
+    """Tests for sanitize_text function."""
+
+    def test_removes_escape_sequences(self):
+        """Test that terminal colour codes are removed."""
+        assert sanitize_text("\x1b[31mBuild failed\x1b[0m") == "Build failed"
+
+    def test_collapses_whitespace_and_controls(self):
+        """Test that control characters and whitespace runs become single spaces."""
+        assert sanitize_text("  line one\n\tline\x07two  ") == "line one line two"
+
+    def test_truncates_at_word_boundary(self):
+        """Test that overlong text is cut at the last space within the limit."""
+        assert sanitize_text("alpha beta gamma", max_chars=12) == "alpha beta"
+
+    def test_truncates_single_word(self):
+        """Test that a single overlong word is cut at the limit."""
+        assert sanitize_text("abcdefghij", max_chars=4) == "abcd"
@@ -1,13 +1,33 @@
 """Tests for main module."""
 
+import os
 import tempfile
+import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, MagicMock, AsyncMock, ANY
 import pytest
 import sys
 from io import StringIO
 
-from speaky.main import parse_arguments, main, cli_main
+from speaky.breaker import CircuitOpenError
+from speaky.cache import get_cache_file
+from speaky.main import parse_arguments, parse_http_arguments, main, cli_main
+from speaky.priority import active_priorities
+
+CONFIG = {"api_key": "test", "voice": "nova", "instructions": "test"}
+
+
+@pytest.fixture(autouse=True)
+def startup_stages():
+    """Stub out libVLC initialization."""
+    with patch('speaky.main.create_vlc_instance') as mock_create_vlc:
+        yield mock_create_vlc
+
+
+def make_args():
+    """Build parsed arguments with every option at its default."""
+    with patch.object(sys, 'argv', ["speaky"]):
+        return parse_arguments()
 
 
 class TestParseArguments:
@@ -61,6 +81,38 @@ class TestParseArguments:
         assert args.clear_cache
         assert args.text == ["hello", "world"]
 
+    def test_parse_arguments_batch_requires_output(self):
+        """Test that --batch without --output is rejected."""
+        test_args = ["speaky", "--batch", "parts.txt"]
+        
+        with patch.object(sys, 'argv', test_args):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+    
+    def test_parse_arguments_fallback_requires_json_field(self):
+        """Test that --fallback without --json-field is rejected."""
+        test_args = ["speaky", "--fallback", "Hello"]
+        
+        with patch.object(sys, 'argv', test_args):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+    
+    def test_parse_arguments_document_requires_output(self):
+        """Test that --document without --output is rejected."""
+        test_args = ["speaky", "--document", "notes.md"]
+        
+        with patch.object(sys, 'argv', test_args):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+    
+    def test_parse_arguments_detach_only_for_speech(self):
+        """Test that --detach is rejected with modes other than spoken text."""
+        test_args = ["speaky", "--detach", "--stdin"]
+        
+        with patch.object(sys, 'argv', test_args):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+
 
 class TestMain:
     """Tests for main function."""
@@ -71,7 +123,7 @@ class TestMain:
     async def test_main_clear_cache(self, mock_parse_args, mock_clear_cache):
         """Test main function with clear cache option."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = True
         mock_parse_args.return_value = mock_args
         
@@ -81,25 +133,30 @@ class TestMain:
         # Verify
         mock_clear_cache.assert_called_once()
     
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
     @patch('speaky.main.play_audio_file')
     @patch('speaky.main.generate_and_cache_audio')
     @patch('speaky.main.load_config')
     @patch('speaky.main.parse_arguments')
     @pytest.mark.asyncio
     async def test_main_with_text(self, mock_parse_args, mock_load_config, 
-                                  mock_generate_audio, mock_play_audio):
+                                  mock_generate_audio, mock_play_audio,
+                                  mock_record_phrase, mock_fingerprint_changed):
         """Test main function with text input."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = False
         mock_args.text = ["hello", "world"]
         mock_parse_args.return_value = mock_args
         
-        mock_config = {"api_key": "test"}
+        mock_config = dict(CONFIG)
         mock_load_config.return_value = mock_config
         
         cache_file = Path("/test/cache.mp3")
         mock_generate_audio.return_value = cache_file
+        # The phrase is only recorded once playback has finished
+        mock_play_audio.side_effect = lambda *args, **kwargs: mock_record_phrase.assert_not_called()
         
         # Execute
         await main()
@@ -107,23 +164,135 @@ class TestMain:
         # Verify
         mock_load_config.assert_called_once()
         mock_generate_audio.assert_called_once_with("hello world", mock_config)
-        mock_play_audio.assert_called_once_with(cache_file)
+        mock_play_audio.assert_called_once_with(cache_file, ANY, claim=ANY, preempt_mode="stop")
+        mock_record_phrase.assert_called_once_with("hello world")
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_compaction(self, mock_parse_args, mock_load_config,
+                                   mock_generate_audio, mock_play_audio,
+                                   mock_record_phrase, mock_fingerprint_changed):
+        """Test main function compacts the text before synthesis when enabled."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["Build", "failed", "in", "/home/user/app/main.py"]
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = {**CONFIG, "compaction": True}
+        mock_load_config.return_value = mock_config
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_generate_audio.assert_called_once_with(
+            "Build failed in main.py", mock_config
+        )
+        mock_record_phrase.assert_called_once_with("Build failed in main.py")
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_json_field(self, mock_parse_args, mock_load_config,
+                                   mock_generate_audio, mock_play_audio,
+                                   mock_record_phrase, mock_fingerprint_changed):
+        """Test main function speaks a sanitized field from JSON on stdin."""
+        # Setup
+        mock_args = make_args()
+        mock_args.json_field = "message"
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        payload = '{"message": "Claude needs\\nyour \\u001b[1mpermission\\u001b[0m"}'
+        
+        # Execute
+        with patch.object(sys, 'stdin', StringIO(payload)):
+            await main()
+        
+        # Verify
+        mock_generate_audio.assert_called_once_with(
+            "Claude needs your permission", mock_config
+        )
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_json_field_fallback(self, mock_parse_args, mock_load_config,
+                                            mock_generate_audio, mock_play_audio,
+                                            mock_record_phrase, mock_fingerprint_changed):
+        """Test main function speaks the fallback when the field is missing."""
+        # Setup
+        mock_args = make_args()
+        mock_args.json_field = "message"
+        mock_args.fallback = "I need your input to proceed."
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        # Execute
+        with patch.object(sys, 'stdin', StringIO('{"title": "Notification"}')):
+            await main()
+        
+        # Verify
+        mock_generate_audio.assert_called_once_with(
+            "I need your input to proceed.", mock_config
+        )
+    
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_json_field_missing(self, mock_parse_args, mock_generate_audio, capsys):
+        """Test main function fails when the field is missing and there is no fallback."""
+        # Setup
+        mock_args = make_args()
+        mock_args.json_field = "message"
+        mock_parse_args.return_value = mock_args
+        
+        # Execute & Verify
+        with patch.object(sys, 'stdin', StringIO('not json')):
+            with pytest.raises(SystemExit) as exc_info:
+                await main()
+        
+        assert exc_info.value.code == 1
+        assert "No 'message' field" in capsys.readouterr().out
+        mock_generate_audio.assert_not_called()
     
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
     @patch('speaky.main.play_audio_file')
     @patch('speaky.main.generate_and_cache_audio')
     @patch('speaky.main.load_config')
     @patch('speaky.main.parse_arguments')
     @pytest.mark.asyncio
     async def test_main_no_text(self, mock_parse_args, mock_load_config, 
-                               mock_generate_audio, mock_play_audio):
+                               mock_generate_audio, mock_play_audio,
+                               mock_record_phrase, mock_fingerprint_changed):
         """Test main function with no text input."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = False
         mock_args.text = []
         mock_parse_args.return_value = mock_args
         
-        mock_config = {"api_key": "test"}
+        mock_config = dict(CONFIG)
         mock_load_config.return_value = mock_config
         
         cache_file = Path("/test/cache.mp3")
@@ -133,15 +302,505 @@ class TestMain:
         await main()
         
         # Verify
-        mock_generate_audio.assert_called_once_with("What would you like me to say?", mock_config)
-        mock_play_audio.assert_called_once_with(cache_file)
+        mock_generate_audio.assert_called_once_with(
+            "What would you like me to say?", mock_config
+        )
+        mock_play_audio.assert_called_once_with(cache_file, ANY, claim=ANY, preempt_mode="stop")
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_overlaps_startup_stages(self, mock_parse_args, mock_load_config,
+                                                mock_generate_audio, mock_play_audio,
+                                                mock_record_phrase, mock_fingerprint_changed,
+                                                startup_stages):
+        """Test VLC init starts before the config is loaded and overlaps it."""
+        # Setup
+        mock_create_vlc = startup_stages
+        started = []
+        mock_create_vlc.side_effect = lambda: started.append("vlc") or "vlc-instance"
+        
+        def slow_load_config():
+            time.sleep(0.1)
+            started.append("config")
+            return dict(CONFIG)
+        
+        mock_load_config.side_effect = slow_load_config
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        assert started == ["vlc", "config"]
+        mock_play_audio.assert_called_once_with(
+            Path("/test/cache.mp3"), "vlc-instance", claim=ANY, preempt_mode="stop"
+        )
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_cache_hit_skips_network(self, mock_parse_args, mock_load_config,
+                                                mock_generate_audio, mock_openai_class,
+                                                mock_play_audio, mock_record_phrase,
+                                                mock_fingerprint_changed):
+        """Test a cache hit is played without opening a connection to the API."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        mock_load_config.return_value = {**CONFIG, "response_format": "mp3"}
+        cache_file = get_cache_file("hello", "nova", "test", "mp3")
+        cache_file.write_bytes(b"audio")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_openai_class.assert_not_called()
+        mock_generate_audio.assert_not_called()
+        mock_play_audio.assert_called_once_with(cache_file, ANY, claim=ANY, preempt_mode="stop")
+    
+    @patch('speaky.main.speak_locally')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_circuit_open_local_fallback(self, mock_parse_args, mock_load_config,
+                                                    mock_generate_audio, mock_play_audio,
+                                                    mock_speak_locally):
+        """Test main function falls back to the local engine while the API is down."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["deploy", "failed"]
+        mock_parse_args.return_value = mock_args
+        mock_load_config.return_value = {**CONFIG, "local_fallback": True}
+        mock_generate_audio.side_effect = CircuitOpenError("TTS API unavailable")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_speak_locally.assert_called_once_with("deploy failed")
+        mock_play_audio.assert_not_called()
+    
+    @patch('speaky.main.speak_locally')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_circuit_open(self, mock_parse_args, mock_load_config,
+                                     mock_generate_audio, mock_speak_locally, capsys):
+        """Test main function fails fast while the API is down."""
+        # Setup
+        mock_args = make_args()
+        mock_parse_args.return_value = mock_args
+        mock_load_config.return_value = dict(CONFIG)
+        mock_generate_audio.side_effect = CircuitOpenError("TTS API unavailable")
+        
+        # Execute & Verify
+        with pytest.raises(SystemExit) as exc_info:
+            await main()
+        
+        assert exc_info.value.code == 1
+        assert "❌ TTS API unavailable" in capsys.readouterr().out
+        mock_speak_locally.assert_not_called()
+    
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_invalid_preempt_mode(self, mock_parse_args, mock_load_config,
+                                             mock_generate_audio, mock_play_audio, capsys):
+        """Test main function rejects an unknown preempt_mode before synthesis."""
+        # Setup
+        mock_parse_args.return_value = make_args()
+        mock_load_config.return_value = {**CONFIG, "preempt_mode": "fade"}
+        
+        # Execute & Verify
+        with pytest.raises(SystemExit) as exc_info:
+            await main()
+        
+        assert exc_info.value.code == 1
+        assert "Invalid preempt_mode 'fade'" in capsys.readouterr().out
+        mock_generate_audio.assert_not_called()
+        mock_play_audio.assert_not_called()
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_priority_claim(self, mock_parse_args, mock_load_config,
+                                       mock_generate_audio, mock_play_audio,
+                                       mock_record_phrase, mock_fingerprint_changed):
+        """Test main function holds a claim at the requested priority while playing."""
+        # Setup
+        with patch.object(sys, 'argv', ["speaky", "--priority", "10", "deploy failed"]):
+            mock_parse_args.return_value = parse_arguments()
+        mock_load_config.return_value = {**CONFIG, "preempt_mode": "duck"}
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        def check_claim(cache_file, instance, claim, preempt_mode):
+            assert active_priorities() == [10]
+            assert preempt_mode == "duck"
+        
+        mock_play_audio.side_effect = check_claim
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_play_audio.assert_called_once()
+        assert active_priorities() == []
+    
+    @patch('speaky.main.rewarm_cache', new_callable=AsyncMock)
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_rewarm(self, mock_parse_args, mock_load_config,
+                               mock_generate_audio, mock_rewarm):
+        """Test main function re-warms the cache and exits."""
+        # Setup
+        mock_args = make_args()
+        mock_args.rewarm = True
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_rewarm.assert_called_once_with(mock_config)
+        mock_load_config.assert_called_once_with(overrides=False)
+        mock_generate_audio.assert_not_called()
+    
+    @patch('speaky.main.compact_cache')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_compact_cache(self, mock_parse_args, mock_load_config,
+                                      mock_generate_audio, mock_compact):
+        """Test main function compacts the cache and exits."""
+        # Setup
+        mock_args = make_args()
+        mock_args.compact_cache = True
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_compact.assert_called_once_with(mock_config)
+        mock_generate_audio.assert_not_called()
+    
+    @patch('speaky.main.speak_stream', new_callable=AsyncMock)
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_stdin(self, mock_parse_args, mock_load_config,
+                              mock_generate_audio, mock_speak_stream):
+        """Test main function speaks streamed stdin input."""
+        # Setup
+        mock_args = make_args()
+        mock_args.stdin = True
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_speak_stream.assert_called_once_with(sys.stdin.buffer, mock_config, 0)
+        mock_generate_audio.assert_not_called()
+    
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.render_to_file', new_callable=AsyncMock)
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_output(self, mock_parse_args, mock_load_config,
+                               mock_render, mock_play_audio):
+        """Test main function renders to a file without playback."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello", "world"]
+        mock_args.output = "out.mp3"
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_render.assert_called_once_with(["hello world"], mock_config, Path("out.mp3"))
+        mock_play_audio.assert_not_called()
+    
+    @patch('speaky.main.render_to_file', new_callable=AsyncMock)
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_batch(self, mock_parse_args, mock_load_config, mock_render, tmp_path):
+        """Test main function renders every batch line into one file."""
+        # Setup
+        batch_file = tmp_path / "parts.txt"
+        batch_file.write_text("Part one.\nPart two.\n")
+        
+        mock_args = make_args()
+        mock_args.output = "out.wav"
+        mock_args.batch = str(batch_file)
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_render.assert_called_once_with(
+            ["Part one.", "Part two."], mock_config, Path("out.wav")
+        )
+    
+    @patch('speaky.main.render_document', new_callable=AsyncMock)
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_document(self, mock_parse_args, mock_load_config, mock_render_document,
+                                 tmp_path, capsys):
+        """Test main function renders a document and reports reused segments."""
+        # Setup
+        document = tmp_path / "notes.md"
+        document.write_text("Release notes.")
+        
+        mock_args = make_args()
+        mock_args.output = "notes.wav"
+        mock_args.document = str(document)
+        mock_parse_args.return_value = mock_args
+        
+        mock_config = dict(CONFIG)
+        mock_load_config.return_value = mock_config
+        mock_render_document.return_value = (2, 30)
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_render_document.assert_called_once_with(
+            "Release notes.", mock_config, Path("notes.wav")
+        )
+        assert "(2 of 30 segments synthesized)" in capsys.readouterr().out
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.fingerprint_changed', return_value=True)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_config_change_starts_rewarm(self, mock_parse_args, mock_load_config,
+                                                    mock_generate_audio, mock_play_audio,
+                                                    mock_record_phrase, mock_fingerprint_changed,
+                                                    mock_spawn):
+        """Test main function starts a background re-warm when voice settings change."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = dict(CONFIG)
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_record_phrase.assert_called_once_with("hello")
+        mock_spawn.assert_called_once_with(["--rewarm"])
+        mock_play_audio.assert_called_once()
+    
+    @patch.dict(os.environ, {'SPEAKY_VOICE': 'echo'})
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_override_not_fingerprinted(self, mock_parse_args, mock_load_config,
+                                                   mock_generate_audio, mock_play_audio,
+                                                   mock_record_phrase, mock_fingerprint_changed,
+                                                   mock_spawn):
+        """Test main function fingerprints the file config, not a one-off voice override."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        def fake_load_config(overrides=True):
+            return dict(CONFIG, voice="echo") if overrides else dict(CONFIG)
+        mock_load_config.side_effect = fake_load_config
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        assert mock_generate_audio.call_args.args[1]["voice"] == "echo"
+        mock_fingerprint_changed.assert_called_once_with(CONFIG)
+        mock_spawn.assert_not_called()
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_compact_storage_starts_compaction(self, mock_parse_args, mock_load_config,
+                                                          mock_generate_audio, mock_play_audio,
+                                                          mock_record_phrase, mock_fingerprint_changed,
+                                                          mock_spawn):
+        """Test main function compacts new MP3 entries in the background."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = {**CONFIG, "storage_format": "opus"}
+        mock_generate_audio.return_value = Path("/test/cache.mp3")
+        # Compaction deletes the MP3, so it must not start before playback
+        mock_play_audio.side_effect = lambda *args, **kwargs: mock_spawn.assert_not_called()
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_spawn.assert_called_once_with(["--compact-cache"])
+        mock_play_audio.assert_called_once()
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_compacted_hit_skips_compaction(self, mock_parse_args, mock_load_config,
+                                                       mock_generate_audio, mock_play_audio,
+                                                       mock_record_phrase, mock_fingerprint_changed,
+                                                       mock_spawn):
+        """Test main function does not start compaction for an already compact entry."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = {**CONFIG, "storage_format": "opus"}
+        mock_generate_audio.return_value = Path("/test/cache.opus")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_spawn.assert_not_called()
+        mock_play_audio.assert_called_once_with(
+            Path("/test/cache.opus"), ANY, claim=ANY, preempt_mode="stop"
+        )
+    
+    @patch('speaky.main.fingerprint_changed', return_value=False)
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.generate_time_compressed')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_playback_speed(self, mock_parse_args, mock_load_config,
+                                       mock_time_compressed, mock_generate_audio,
+                                       mock_play_audio, mock_record_phrase,
+                                       mock_fingerprint_changed):
+        """Test main function plays the time-compressed variant at a playback speed."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        config = {**CONFIG, "playback_speed": 1.5}
+        mock_load_config.return_value = config
+        mock_time_compressed.return_value = Path("/test/cache.x1.50.wav")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_generate_audio.assert_not_called()
+        mock_time_compressed.assert_called_once_with("hello", config, 1.5)
+        mock_play_audio.assert_called_once_with(
+            Path("/test/cache.x1.50.wav"), ANY, claim=ANY, preempt_mode="stop"
+        )
+    
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_invalid_playback_speed(self, mock_parse_args, mock_load_config,
+                                               mock_generate_audio):
+        """Test main function rejects a playback speed out of range."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = {**CONFIG, "playback_speed": 4}
+        
+        # Execute & Verify
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            with pytest.raises(SystemExit) as exc_info:
+                await main()
+        
+        assert exc_info.value.code == 1
+        assert "playback_speed must be between" in mock_stdout.getvalue()
+        mock_generate_audio.assert_not_called()
     
     @patch('speaky.main.parse_arguments')
     @pytest.mark.asyncio
     async def test_main_config_error(self, mock_parse_args):
         """Test main function with configuration error."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = False
         mock_args.text = ["test"]
         mock_parse_args.return_value = mock_args
@@ -158,7 +817,7 @@ class TestMain:
     async def test_main_import_error(self, mock_parse_args):
         """Test main function with import error."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = False
         mock_args.text = ["test"]
         mock_parse_args.return_value = mock_args
@@ -175,7 +834,7 @@ class TestMain:
     async def test_main_unexpected_error(self, mock_parse_args):
         """Test main function with unexpected error."""
         # Setup
-        mock_args = MagicMock()
+        mock_args = make_args()
         mock_args.clear_cache = False
         mock_args.text = ["test"]
         mock_parse_args.return_value = mock_args
@@ -186,23 +845,164 @@ class TestMain:
                 await main()
             
             assert exc_info.value.code == 1
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_detach_hit_plays_in_child(self, mock_parse_args, mock_load_config,
+                                                  mock_generate_audio, mock_record_phrase,
+                                                  mock_spawn):
+        """Test --detach hands a cached entry to a detached player and returns."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["All", "tests", "passed."]
+        mock_args.detach = True
+        mock_args.priority = 2
+        mock_parse_args.return_value = mock_args
+        
+        config = {**CONFIG, "response_format": "mp3"}
+        mock_load_config.return_value = config
+        cache_file = get_cache_file("All tests passed.", "nova", "test", "mp3")
+        cache_file.write_bytes(b"audio")
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_spawn.assert_called_once_with(
+            ["--play-file", str(cache_file), "--priority", "2", "--", "All tests passed."]
+        )
+        mock_record_phrase.assert_not_called()
+        mock_generate_audio.assert_not_called()
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_detach_miss_synthesizes_in_child(self, mock_parse_args, mock_load_config,
+                                                         mock_generate_audio, mock_spawn):
+        """Test --detach leaves synthesis of a missing entry to the child."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["-", "new", "phrase"]
+        mock_args.detach = True
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = dict(CONFIG)
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_spawn.assert_called_once_with(["--priority", "0", "--", "- new phrase"])
+        mock_generate_audio.assert_not_called()
+    
+    @patch('speaky.main.spawn_detached')
+    @patch('speaky.main.load_config', side_effect=ValueError("OPENAI_API_KEY not found"))
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_detach_config_error_left_to_child(self, mock_parse_args, mock_load_config,
+                                                          mock_spawn):
+        """Test --detach still returns at once when the config cannot be loaded."""
+        # Setup
+        mock_args = make_args()
+        mock_args.text = ["hello"]
+        mock_args.detach = True
+        mock_parse_args.return_value = mock_args
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_spawn.assert_called_once_with(["--priority", "0", "--", "hello"])
+    
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.generate_and_cache_audio')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_play_file(self, mock_parse_args, mock_load_config,
+                                  mock_generate_audio, mock_play_audio):
+        """Test the detached player plays the file under a playback claim."""
+        # Setup
+        mock_args = make_args()
+        mock_args.play_file = "/test/cache.mp3"
+        mock_args.priority = 3
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = {**CONFIG, "preempt_mode": "duck"}
+        seen = []
+        mock_play_audio.side_effect = lambda *args, **kwargs: seen.append(active_priorities())
+        
+        # Execute
+        await main()
+        
+        # Verify
+        mock_generate_audio.assert_not_called()
+        mock_play_audio.assert_called_once_with(
+            Path("/test/cache.mp3"), ANY, claim=ANY, preempt_mode="duck"
+        )
+        assert seen == [[3]]
+    
+    @patch('speaky.main.record_phrase')
+    @patch('speaky.main.play_audio_file')
+    @patch('speaky.main.load_config')
+    @patch('speaky.main.parse_arguments')
+    @pytest.mark.asyncio
+    async def test_main_play_file_records_phrase(self, mock_parse_args, mock_load_config,
+                                                 mock_play_audio, mock_record_phrase):
+        """Test the detached player records the phrase it was given after playback."""
+        # Setup
+        mock_args = make_args()
+        mock_args.play_file = "/test/cache.mp3"
+        mock_args.text = ["All", "tests", "passed."]
+        mock_parse_args.return_value = mock_args
+        
+        mock_load_config.return_value = dict(CONFIG)
+        events = []
+        mock_play_audio.side_effect = lambda *args, **kwargs: events.append("play")
+        mock_record_phrase.side_effect = lambda text: events.append(("record", text))
+        
+        # Execute
+        await main()
+        
+        # Verify
+        assert events == ["play", ("record", "All tests passed.")]
 
 
 class TestCliMain:
     """Tests for cli_main function."""
     
-    @patch('speaky.main.install_default_config')
     @patch('speaky.main.asyncio.run')
-    def test_cli_main_success(self, mock_asyncio_run, mock_install_config):
+    def test_cli_main_success(self, mock_asyncio_run):
         """Test cli_main function successful execution."""
         cli_main()
 
-        mock_install_config.assert_called_once()
         mock_asyncio_run.assert_called_once()
 
-    @patch('speaky.main.install_default_config')
+    @patch('speaky.main.http_main', new_callable=MagicMock)
+    @patch('speaky.main.asyncio.run')
+    def test_cli_main_http(self, mock_asyncio_run, mock_http_main):
+        """Test cli_main dispatches the http subcommand."""
+        with patch.object(sys, 'argv', ["speaky", "http", "--port", "9000"]):
+            cli_main()
+
+        mock_http_main.assert_called_once_with(["--port", "9000"])
+        mock_asyncio_run.assert_called_once_with(mock_http_main.return_value)
+
+    def test_parse_http_arguments(self):
+        """Test parsing http subcommand arguments."""
+        args = parse_http_arguments(["--port", "9000"])
+
+        assert args.port == 9000
+        assert args.host == "127.0.0.1"
+
     @patch('speaky.main.asyncio.run')
-    def test_cli_main_keyboard_interrupt(self, mock_asyncio_run, mock_install_config):
+    def test_cli_main_keyboard_interrupt(self, mock_asyncio_run):
         """Test cli_main function with keyboard interrupt."""
         mock_asyncio_run.side_effect = KeyboardInterrupt()
 
@@ -211,9 +1011,8 @@ class TestCliMain:
 
         assert exc_info.value.code == 1
 
-    @patch('speaky.main.install_default_config')
     @patch('speaky.main.asyncio.run')
-    def test_cli_main_other_exception(self, mock_asyncio_run, mock_install_config):
+    def test_cli_main_other_exception(self, mock_asyncio_run):
         """Test cli_main function with other exceptions."""
         mock_asyncio_run.side_effect = Exception("Some error")
 
@@ -254,5 +1053,7 @@ class TestIntegration:
         
         # Verify full workflow
         mock_load_config.assert_called_once()
-        mock_generate_audio.assert_called_once_with("integration test text", mock_config)
-        mock_play_audio.assert_called_once_with(cache_file)
\ No newline at end of file
+        mock_generate_audio.assert_called_once_with(
+            "integration test text", mock_config
+        )
+        mock_play_audio.assert_called_once_with(cache_file, ANY, claim=ANY, preempt_mode="stop")
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Tests for priority module."""
+
+import asyncio
+import os
+import time
+import pytest
+
+from speaky import priority
+from speaky.priority import PlaybackClaim, active_priorities, get_claims_dir, wait_until_idle
+
+
+class TestPlaybackClaim:
+    """Tests for PlaybackClaim class."""
+
+    def test_claim_registered_while_held(self):
+        """Test that a claim is visible only inside the context."""
+        with PlaybackClaim(5) as claim:
+            assert claim.path.exists()
+            assert active_priorities() == [5]
+
+        assert not claim.path.exists()
+        assert active_priorities() == []
+
+    def test_outranked_by_higher_priority(self):
+        """Test that only a strictly higher priority outranks a claim."""
+        with PlaybackClaim(1) as low:
+            assert not low.outranked()
+            with PlaybackClaim(1):
+                assert not low.outranked()
+            with PlaybackClaim(2) as high:
+                assert low.outranked()
+                assert not high.outranked()
+
+    def test_heartbeat_refreshes_claim(self, monkeypatch):
+        """Test that the heartbeat keeps a long-held claim fresh."""
+        # Setup
+        monkeypatch.setattr(priority, "HEARTBEAT_INTERVAL", 0.01)
+
+        with PlaybackClaim() as claim:
+            old = time.time() - 60
+            os.utime(claim.path, (old, old))
+
+            # Execute
+            time.sleep(0.1)
+
+            # Verify
+            assert claim.path.stat().st_mtime > old
+
+
+class TestActivePriorities:
+    """Tests for active_priorities function."""
+
+    def test_stale_claim_removed(self):
+        """Test that a claim left by a dead process is ignored and removed."""
+        # Setup
+        stale = get_claims_dir() / "123-dead.claim"
+        stale.write_text("9")
+        old = time.time() - priority.CLAIM_TIMEOUT - 1
+        os.utime(stale, (old, old))
+
+        # Execute & Verify
+        assert active_priorities() == []
+        assert not stale.exists()
+
+    def test_unreadable_claim_ignored(self):
+        """Test that a claim that is still being written is skipped."""
+        (get_claims_dir() / "123-new.claim").write_text("")
+
+        assert active_priorities() == []
+
+
+class TestWaitUntilIdle:
+    """Tests for wait_until_idle function."""
+
+    @pytest.mark.asyncio
+    async def test_returns_when_idle(self):
+        """Test that waiting returns immediately with no claims."""
+        await asyncio.wait_for(wait_until_idle(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_claim_release(self, monkeypatch):
+        """Test that waiting lasts until the last claim is released."""
+        # Setup
+        monkeypatch.setattr(priority, "IDLE_POLL_INTERVAL", 0.01)
+        claim = PlaybackClaim()
+        claim.__enter__()
+
+        # Execute
+        waiter = asyncio.create_task(wait_until_idle())
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        claim.__exit__(None, None, None)
+
+        # Verify
+        await asyncio.wait_for(waiter, timeout=1)
@@ -0,0 +1,215 @@
+"""Tests for render module."""
+
+from unittest.mock import patch, AsyncMock
+import pytest
+
+from speaky.render import (
+    extract_audio_payload,
+    read_batch,
+    render_to_file,
+    write_concatenated,
+)
+
+# MPEG 1 Layer III, 128 kbit/s, 44.1 kHz, no padding: 417-byte frames
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_LENGTH = 417
+
+
+def make_wav(samples: bytes, data_size=None) -> bytes:
+    """Build a 24 kHz mono 16-bit WAV file around ``samples``."""
+    fmt = (1).to_bytes(2, "little") + (1).to_bytes(2, "little")
+    fmt += (24000).to_bytes(4, "little") + (48000).to_bytes(4, "little")
+    fmt += (2).to_bytes(2, "little") + (16).to_bytes(2, "little")
+    size = len(samples) if data_size is None else data_size
+    body = b"WAVE" + b"fmt " + len(fmt).to_bytes(4, "little") + fmt
+    body += b"data" + size.to_bytes(4, "little") + samples
+    return b"RIFF" + len(body).to_bytes(4, "little") + body
+
+
+def make_mp3_frame(fill: bytes, tag: bytes = b"") -> bytes:
+    """Build a single MP3 frame, optionally carrying a Xing/Info tag."""
+    body = bytearray(fill * (MP3_FRAME_LENGTH - 4))
+    body[32 : 32 + len(tag)] = tag
+    return MP3_FRAME_HEADER + bytes(body)
+
+
+class TestReadBatch:
+    """Tests for read_batch function."""
+
+    def test_read_batch_skips_blank_lines(self, tmp_path):
+        """Test that each non-empty line becomes one input."""
+        batch_file = tmp_path / "batch.txt"
+        batch_file.write_text("First part.\n\n  Second part.  \n")
+
+        assert read_batch(str(batch_file)) == ["First part.", "Second part."]
+
+
+class TestExtractAudioPayload:
+    """Tests for extract_audio_payload function."""
+
+    def test_wav_payload(self, tmp_path):
+        """Test that WAV sample data is separated from the header."""
+        wav_file = tmp_path / "part.wav"
+        wav_file.write_bytes(make_wav(b"\x01\x02\x03\x04"))
+
+        fmt, payload = extract_audio_payload(str(wav_file), "wav")
+
+        assert len(fmt) == 16
+        assert payload == b"\x01\x02\x03\x04"
+
+    def test_streamed_wav_without_length(self, tmp_path):
+        """Test that a streamed WAV with an unknown data size is read to the end."""
+        wav_file = tmp_path / "part.wav"
+        wav_file.write_bytes(make_wav(b"\x01\x02\x03\x04", data_size=0xFFFFFFFF))
+
+        _, payload = extract_audio_payload(str(wav_file), "wav")
+
+        assert payload == b"\x01\x02\x03\x04"
+
+    def test_invalid_wav(self, tmp_path):
+        """Test that a non-WAV file is rejected."""
+        wav_file = tmp_path / "part.wav"
+        wav_file.write_bytes(b"not a wav file")
+
+        with pytest.raises(ValueError):
+            extract_audio_payload(str(wav_file), "wav")
+
+    def test_mp3_strips_tags_and_info_frame(self, tmp_path):
+        """Test that ID3 tags and the Xing/Info frame are removed from MP3 parts."""
+        id3v2 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+        info_frame = make_mp3_frame(b"\x00", tag=b"Info")
+        audio_frame = make_mp3_frame(b"\x55")
+        id3v1 = b"TAG" + b"\x00" * 125
+        mp3_file = tmp_path / "part.mp3"
+        mp3_file.write_bytes(id3v2 + info_frame + audio_frame + id3v1)
+
+        _, payload = extract_audio_payload(str(mp3_file), "mp3")
+
+        assert payload == audio_frame
+
+    def test_mp3_without_info_frame_is_kept(self, tmp_path):
+        """Test that a plain MP3 keeps all of its frames."""
+        frames = make_mp3_frame(b"\x55") + make_mp3_frame(b"\x66")
+        mp3_file = tmp_path / "part.mp3"
+        mp3_file.write_bytes(frames)
+
+        _, payload = extract_audio_payload(str(mp3_file), "mp3")
+
+        assert payload == frames
+
+    def test_unsupported_format(self, tmp_path):
+        """Test that formats that cannot be joined are rejected."""
+        opus_file = tmp_path / "part.opus"
+        opus_file.write_bytes(b"OggS")
+
+        with pytest.raises(ValueError):
+            extract_audio_payload(str(opus_file), "opus")
+
+
+class TestWriteConcatenated:
+    """Tests for write_concatenated function."""
+
+    def test_wav_header_covers_all_parts(self, tmp_path):
+        """Test that joined WAV data is wrapped in one correct header."""
+        source = tmp_path / "source.wav"
+        source.write_bytes(make_wav(b""))
+        fmt, _ = extract_audio_payload(str(source), "wav")
+        output = tmp_path / "out.wav"
+
+        write_concatenated([(fmt, b"\x01\x02"), (fmt, b"\x03\x04")], output, "wav")
+
+        fmt_out, payload = extract_audio_payload(str(output), "wav")
+        assert fmt_out == fmt
+        assert payload == b"\x01\x02\x03\x04"
+
+    def test_wav_mismatched_formats(self, tmp_path):
+        """Test that WAV parts with different formats are rejected."""
+        with pytest.raises(ValueError):
+            write_concatenated(
+                [(b"fmt-a", b"\x00\x00"), (b"fmt-b", b"\x00\x00")],
+                tmp_path / "out.wav",
+                "wav",
+            )
+
+
+class TestRenderToFile:
+    """Tests for render_to_file function."""
+
+    @patch('speaky.render.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_render_joins_parts_in_order(self, mock_generate, tmp_path):
+        """Test that parts are synthesized as WAV and joined in input order."""
+        # Setup
+        def fake_generate(text, config, exact_format=False, lane="interactive"):
+            part = tmp_path / f"{text}.wav"
+            part.write_bytes(make_wav(text.encode()))
+            return part
+
+        mock_generate.side_effect = fake_generate
+        output = tmp_path / "out.wav"
+
+        # Execute
+        result = await render_to_file(["ab", "cd", "ef"], {"voice": "nova"}, output)
+
+        # Verify
+        assert result == output
+        _, payload = extract_audio_payload(str(output), "wav")
+        assert payload == b"abcdef"
+        for call in mock_generate.call_args_list:
+            assert call.args[1]["response_format"] == "wav"
+            assert call.kwargs["exact_format"] is True
+            assert call.kwargs["lane"] == "background"
+
+    @patch('speaky.render.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_render_single_part_copies_file(self, mock_generate, tmp_path):
+        """Test that a single input is copied straight from the cache."""
+        cache_file = tmp_path / "cached.opus"
+        cache_file.write_bytes(b"OggS audio")
+        mock_generate.return_value = cache_file
+        output = tmp_path / "out.opus"
+
+        await render_to_file(["hello"], {"voice": "nova"}, output)
+
+        assert output.read_bytes() == b"OggS audio"
+
+    @pytest.mark.asyncio
+    async def test_render_unsupported_extension(self, tmp_path):
+        """Test that an unknown output extension is rejected."""
+        with pytest.raises(ValueError) as exc_info:
+            await render_to_file(["hello"], {}, tmp_path / "out.xyz")
+
+        assert "Unsupported output format" in str(exc_info.value)
+
+    @pytest.mark.asyncio
+    async def test_render_cannot_join_opus(self, tmp_path):
+        """Test that several inputs cannot be joined into a format without frame access."""
+        with pytest.raises(ValueError):
+            await render_to_file(["a", "b"], {}, tmp_path / "out.opus")
+
+    @pytest.mark.asyncio
+    async def test_render_no_parts(self, tmp_path):
+        """Test that an empty batch is rejected."""
+        with pytest.raises(ValueError):
+            await render_to_file([], {}, tmp_path / "out.wav")
+
+    @patch('speaky.render.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_render_repeated_parts_synthesized_once(self, mock_generate, tmp_path):
+        """Test that an input repeated in a batch is synthesized once and reused."""
+        # Setup
+        def fake_generate(text, config, exact_format=False, lane="interactive"):
+            part = tmp_path / f"{text}.wav"
+            part.write_bytes(make_wav(text.encode()))
+            return part
+
+        mock_generate.side_effect = fake_generate
+        output = tmp_path / "out.wav"
+
+        # Execute
+        await render_to_file(["ab", "cd", "ab"], {"voice": "nova"}, output)
+
+        # Verify
+        assert mock_generate.call_count == 2
+        _, payload = extract_audio_payload(str(output), "wav")
+        assert payload == b"abcdab"
@@ -0,0 +1,131 @@
+"""Tests for scheduler module."""
+
+import asyncio
+
+import pytest
+
+from speaky.scheduler import SynthesisScheduler, INTERACTIVE, BACKGROUND
+
+
+async def hold(scheduler, lane, started, release, order=None, name=None):
+    """Hold a slot in ``lane`` until ``release`` is set."""
+    async with scheduler.slot(lane):
+        if order is not None:
+            order.append(name)
+        started.append(lane)
+        await release.wait()
+
+
+async def settle():
+    """Let every ready task run."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestSynthesisScheduler:
+    """Tests for SynthesisScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_background_uses_every_slot_when_idle(self):
+        """Test that background work alone reaches the full limit."""
+        # Setup
+        scheduler = SynthesisScheduler(limit=3, reserve=1)
+        started, release = [], asyncio.Event()
+
+        # Execute
+        tasks = [asyncio.create_task(hold(scheduler, BACKGROUND, started, release)) for _ in range(5)]
+        await settle()
+
+        # Verify
+        assert scheduler.running[BACKGROUND] == 3
+        assert scheduler.waiting(BACKGROUND) == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        assert scheduler.running == {INTERACTIVE: 0, BACKGROUND: 0}
+
+    @pytest.mark.asyncio
+    async def test_interactive_not_queued_behind_background(self):
+        """Test that an interactive request starts while background work fills the limit."""
+        # Setup
+        scheduler = SynthesisScheduler(limit=2, reserve=1)
+        started, release = [], asyncio.Event()
+        background = [asyncio.create_task(hold(scheduler, BACKGROUND, started, release)) for _ in range(4)]
+        await settle()
+
+        # Execute
+        interactive = asyncio.create_task(hold(scheduler, INTERACTIVE, started, release))
+        await settle()
+
+        # Verify
+        assert scheduler.running == {INTERACTIVE: 1, BACKGROUND: 2}
+        assert scheduler.waiting(BACKGROUND) == 2
+        release.set()
+        await asyncio.gather(interactive, *background)
+
+    @pytest.mark.asyncio
+    async def test_waiting_lanes_share_slots_by_weight(self):
+        """Test that freed slots go to waiting lanes in proportion to their weights."""
+        # Setup
+        scheduler = SynthesisScheduler(limit=1, reserve=0, weights={INTERACTIVE: 3, BACKGROUND: 1})
+        started, order = [], []
+        releases = {"first": asyncio.Event()}
+        tasks = {"first": asyncio.create_task(
+            hold(scheduler, BACKGROUND, started, releases["first"], order, "first")
+        )}
+        await settle()
+        for i in range(4):
+            for lane in (INTERACTIVE, BACKGROUND):
+                name = f"{lane}-{i}"
+                releases[name] = asyncio.Event()
+                tasks[name] = asyncio.create_task(
+                    hold(scheduler, lane, started, releases[name], order, name)
+                )
+        await settle()
+
+        # Execute: release each request as soon as it holds the slot
+        for _ in range(9):
+            holder = order[-1]
+            releases[holder].set()
+            await tasks[holder]
+            await settle()
+
+        # Verify
+        lanes = [name.split("-")[0] for name in order[1:]]
+        assert lanes == [
+            INTERACTIVE, INTERACTIVE, BACKGROUND, INTERACTIVE,
+            INTERACTIVE, BACKGROUND, BACKGROUND, BACKGROUND,
+        ]
+        # Requests within a lane keep their order
+        assert [name for name in order if name.startswith(BACKGROUND)] == [
+            f"{BACKGROUND}-{i}" for i in range(4)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_is_skipped(self):
+        """Test that a request cancelled while waiting does not take a slot."""
+        # Setup
+        scheduler = SynthesisScheduler(limit=1, reserve=0)
+        started, release = [], asyncio.Event()
+        holder = asyncio.create_task(hold(scheduler, BACKGROUND, started, release))
+        await settle()
+        cancelled = asyncio.create_task(hold(scheduler, BACKGROUND, started, release))
+        waiter = asyncio.create_task(hold(scheduler, BACKGROUND, started, release))
+        await settle()
+
+        # Execute
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+        # Verify
+        assert started == [BACKGROUND, BACKGROUND]
+        assert scheduler.running[BACKGROUND] == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_lane(self):
+        """Test that an unknown lane is rejected."""
+        scheduler = SynthesisScheduler()
+        with pytest.raises(ValueError, match="Unknown synthesis lane"):
+            async with scheduler.slot("bulk"):
+                pass
@@ -0,0 +1,113 @@
+"""Tests for segments module."""
+
+from pathlib import Path
+from unittest.mock import patch, AsyncMock
+import pytest
+
+from speaky.cache import get_cache_file
+from speaky.segments import split_segments, render_document, read_document
+
+CONFIG = {
+    "api_key": "test-key",
+    "model": "gpt-4o-mini-tts",
+    "voice": "nova",
+    "instructions": "test instructions",
+    "response_format": "mp3",
+}
+
+
+def make_document(count: int, edited: int | None = None) -> str:
+    """Build a document of ``count`` numbered sentences in paragraphs of ten."""
+    sentences = [
+        f"Step {i} {'was changed' if i == edited else 'runs as before'}." for i in range(count)
+    ]
+    paragraphs = [" ".join(sentences[i : i + 10]) for i in range(0, count, 10)]
+    return "\n\n".join(paragraphs)
+
+
+class TestSplitSegments:
+    """Tests for split_segments function."""
+
+    def test_segments_cover_document(self):
+        """Test that segments contain every sentence in order."""
+        document = make_document(40)
+
+        segments = split_segments(document)
+
+        assert " ".join(segments) == " ".join(document.split())
+        assert 1 < len(segments) < 40
+
+    def test_paragraph_ends_segment(self):
+        """Test that a segment never spans a paragraph break."""
+        segments = split_segments("First paragraph.\n\nSecond paragraph.")
+
+        assert segments == ["First paragraph.", "Second paragraph."]
+
+    def test_rewrapping_keeps_segments(self):
+        """Test that changing line wrapping does not change any segment."""
+        document = make_document(20)
+        rewrapped = document.replace(". Step", ".\nStep")
+
+        assert split_segments(rewrapped) == split_segments(document)
+
+    def test_edit_changes_few_segments(self):
+        """Test that editing one sentence leaves the other segments untouched."""
+        # Setup
+        before = split_segments(make_document(100))
+
+        # Execute
+        after = split_segments(make_document(100, edited=55))
+
+        # Verify
+        changed = set(after) - set(before)
+        assert 1 <= len(changed) <= 2
+        assert any("Step 55 was changed." in segment for segment in changed)
+
+    def test_segment_length_bounded(self):
+        """Test that segments never exceed the character limit."""
+        segments = split_segments(make_document(100), max_chars=60)
+
+        assert all(len(segment) <= 60 for segment in segments)
+
+    def test_empty_document(self):
+        """Test that a blank document has no segments."""
+        assert split_segments("\n\n  \n") == []
+
+
+class TestReadDocument:
+    """Tests for read_document function."""
+
+    def test_read_document_file(self, tmp_path):
+        """Test reading a document from a file."""
+        document = tmp_path / "notes.md"
+        document.write_text("Release notes.")
+
+        assert read_document(str(document)) == "Release notes."
+
+
+class TestRenderDocument:
+    """Tests for render_document function."""
+
+    @patch('speaky.segments.render_to_file', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_render_document_counts_cached_segments(self, mock_render):
+        """Test that only segments missing from the cache count as synthesized."""
+        # Setup
+        document = make_document(40)
+        segments = split_segments(document)
+        for segment in segments[1:]:
+            get_cache_file(segment, "nova", "test instructions", "wav").touch()
+        output = Path("notes.wav")
+
+        # Execute
+        synthesized, total = await render_document(document, CONFIG, output)
+
+        # Verify
+        assert (synthesized, total) == (1, len(segments))
+        mock_render.assert_called_once_with(segments, CONFIG, output)
+
+    @pytest.mark.asyncio
+    async def test_render_empty_document(self):
+        """Test that an empty document is rejected."""
+        with pytest.raises(ValueError):
+            await render_document("", CONFIG, Path("notes.wav"))
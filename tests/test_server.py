@@ -0,0 +1,263 @@
+"""Tests for server module."""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+import pytest
+
+from speaky.cache import get_cache_file
+from speaky.server import SpeechServer, HTTPError, parse_range
+
+CONFIG = {
+    "api_key": "test-key",
+    "model": "gpt-4o-mini-tts",
+    "voice": "nova",
+    "instructions": "test instructions",
+    "response_format": "mp3",
+}
+
+
+async def request(port, payload, headers=None):
+    """Send a POST request and return ``(status, headers, body)``."""
+    body = json.dumps(payload).encode() if not isinstance(payload, bytes) else payload
+    lines = ["POST / HTTP/1.1", "Host: localhost", f"Content-Length: {len(body)}"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, _, content = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode().split("\r\n")
+    response_headers = {}
+    for line in header_lines:
+        name, value = line.split(":", 1)
+        response_headers[name.strip().lower()] = value.strip()
+
+    if response_headers.get("transfer-encoding") == "chunked":
+        decoded = b""
+        while True:
+            size_line, _, content = content.partition(b"\r\n")
+            size = int(size_line, 16)
+            if size == 0:
+                break
+            decoded += content[:size]
+            content = content[size + 2 :]
+        content = decoded
+    return int(status_line.split()[1]), response_headers, content
+
+
+@asynccontextmanager
+async def running_server():
+    """Run a SpeechServer on a free local port and yield the port."""
+    server = await asyncio.start_server(SpeechServer(CONFIG).handle, "127.0.0.1", 0)
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def cache_entry(text, content):
+    """Write ``content`` to the cache entry for ``text``."""
+    cache_file = get_cache_file(text, CONFIG["voice"], CONFIG["instructions"], "mp3")
+    cache_file.write_bytes(content)
+    return cache_file
+
+
+class TestParseRange:
+    """Tests for parse_range function."""
+
+    def test_closed_range(self):
+        """Test a range with start and end."""
+        assert parse_range("bytes=2-5", 10) == (2, 5)
+
+    def test_open_range(self):
+        """Test a range without an end."""
+        assert parse_range("bytes=4-", 10) == (4, 9)
+
+    def test_suffix_range(self):
+        """Test a range of the last N bytes."""
+        assert parse_range("bytes=-3", 10) == (7, 9)
+
+    def test_end_clamped_to_size(self):
+        """Test that an end beyond the file is clamped."""
+        assert parse_range("bytes=8-100", 10) == (8, 9)
+
+    def test_unsatisfiable_range(self):
+        """Test that a range starting beyond the file is rejected."""
+        with pytest.raises(HTTPError):
+            parse_range("bytes=20-", 10)
+
+    def test_multiple_ranges_ignored(self):
+        """Test that multi-range requests fall back to the full file."""
+        assert parse_range("bytes=0-1,4-5", 10) is None
+
+
+class TestSpeechServer:
+    """Tests for SpeechServer class."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit(self):
+        """Test that a cached entry is served whole with an ETag."""
+        cache_file = cache_entry("hello", b"cached audio")
+
+        async with running_server() as port:
+            status, headers, body = await request(port, {"text": "hello"})
+
+        assert status == 200
+        assert body == b"cached audio"
+        assert headers["content-type"] == "audio/mpeg"
+        assert headers["etag"] == f'"{cache_file.name}"'
+        assert headers["accept-ranges"] == "bytes"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_range(self):
+        """Test that a Range request returns partial content."""
+        cache_entry("hello", b"0123456789")
+
+        async with running_server() as port:
+            status, headers, body = await request(
+                port, {"text": "hello"}, {"Range": "bytes=2-5"}
+            )
+
+        assert status == 206
+        assert body == b"2345"
+        assert headers["content-range"] == "bytes 2-5/10"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_unsatisfiable_range(self):
+        """Test that an unsatisfiable range returns 416."""
+        cache_entry("hello", b"0123456789")
+
+        async with running_server() as port:
+            status, headers, _ = await request(
+                port, {"text": "hello"}, {"Range": "bytes=50-"}
+            )
+
+        assert status == 416
+        assert headers["content-range"] == "bytes */10"
+
+    @pytest.mark.asyncio
+    async def test_if_none_match(self):
+        """Test that a matching ETag returns 304 without a body."""
+        cache_file = cache_entry("hello", b"cached audio")
+
+        async with running_server() as port:
+            status, _, body = await request(
+                port, {"text": "hello"}, {"If-None-Match": f'"{cache_file.name}"'}
+            )
+
+        assert status == 304
+        assert body == b""
+
+    @pytest.mark.asyncio
+    async def test_voice_override(self):
+        """Test that the request voice selects a different cache entry."""
+        cache_file = get_cache_file("hello", "alloy", CONFIG["instructions"], "mp3")
+        cache_file.write_bytes(b"alloy audio")
+
+        async with running_server() as port:
+            _, _, body = await request(port, {"text": "hello", "voice": "alloy"})
+
+        assert body == b"alloy audio"
+
+    @patch('speaky.server.generate_and_cache_audio')
+    @pytest.mark.asyncio
+    async def test_miss_streams_and_coalesces(self, mock_generate):
+        """Test that concurrent misses share one synthesis and stream its chunks."""
+        # Setup
+        release = asyncio.Event()
+
+        async def fake_generate(text, config, on_chunk=None):
+            on_chunk(b"first ")
+            await release.wait()
+            on_chunk(b"second")
+
+        mock_generate.side_effect = fake_generate
+
+        # Execute
+        async with running_server() as port:
+            requests = [
+                asyncio.create_task(request(port, {"text": "new text"}))
+                for _ in range(3)
+            ]
+            await asyncio.sleep(0.1)
+            release.set()
+            responses = await asyncio.gather(*requests)
+
+        # Verify
+        assert mock_generate.call_count == 1
+        for status, headers, body in responses:
+            assert status == 200
+            assert headers["transfer-encoding"] == "chunked"
+            assert body == b"first second"
+
+    @patch('speaky.server.generate_and_cache_audio')
+    @pytest.mark.asyncio
+    async def test_miss_written_by_another_process(self, mock_generate):
+        """Test that an entry written after the lookup is served as a file."""
+        # Setup
+        async def fake_generate(text, config, on_chunk=None):
+            # Found in the cache, so no chunks are streamed
+            return cache_entry(text, b"written elsewhere")
+
+        mock_generate.side_effect = fake_generate
+
+        # Execute
+        async with running_server() as port:
+            status, headers, body = await request(port, {"text": "new text"})
+
+        # Verify
+        assert status == 200
+        assert "transfer-encoding" not in headers
+        assert headers["content-length"] == str(len(b"written elsewhere"))
+        assert body == b"written elsewhere"
+
+    @patch('speaky.server.generate_and_cache_audio')
+    @pytest.mark.asyncio
+    async def test_miss_synthesis_error(self, mock_generate):
+        """Test that a failed synthesis returns 502."""
+        mock_generate.side_effect = Exception("API Error")
+
+        async with running_server() as port:
+            status, _, body = await request(port, {"text": "new text"})
+
+        assert status == 502
+        assert "API Error" in json.loads(body)["error"]
+
+    @pytest.mark.asyncio
+    async def test_compaction(self):
+        """Test that request text is compacted before the cache lookup."""
+        cache_entry("Deploy failed", b"compact audio")
+
+        with patch.dict(CONFIG, {"compaction": True}):
+            async with running_server() as port:
+                _, _, body = await request(
+                    port, {"text": "Deploy failed https://ci.example.com/runs/1"}
+                )
+
+        assert body == b"compact audio"
+
+    def test_invalid_compaction_setting(self):
+        """Test that a bad compaction setting is rejected at startup."""
+        with pytest.raises(ValueError):
+            SpeechServer({**CONFIG, "compaction": "yes"})
+
+    @pytest.mark.asyncio
+    async def test_missing_text(self):
+        """Test that a request without text returns 400."""
+        async with running_server() as port:
+            status, _, _ = await request(port, {"voice": "nova"})
+
+        assert status == 400
+
+    @pytest.mark.asyncio
+    async def test_invalid_json(self):
+        """Test that a non-JSON body returns 400."""
+        async with running_server() as port:
+            status, _, _ = await request(port, b"not json")
+
+        assert status == 400
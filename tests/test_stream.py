@@ -0,0 +1,218 @@
+"""Tests for stream module."""
+
+import asyncio
+import gc
+import io
+import os
+from pathlib import Path
+from unittest.mock import patch, AsyncMock
+import pytest
+
+from speaky import stream as stream_module
+from speaky.priority import PlaybackClaim, active_priorities
+from speaky.stream import SentenceSplitter, speak_stream
+
+
+class TestSentenceSplitter:
+    """Tests for SentenceSplitter class."""
+
+    def test_feed_splits_complete_sentences(self):
+        """Test that completed sentences are returned and the rest is held."""
+        splitter = SentenceSplitter()
+
+        sentences = splitter.feed("Build started. Tests are running! Still go")
+
+        assert sentences == ["Build started.", "Tests are running!"]
+        assert splitter.flush() == ["Still go"]
+
+    def test_feed_across_chunks(self):
+        """Test that a sentence split across chunks is joined."""
+        splitter = SentenceSplitter()
+
+        assert splitter.feed("Deploy fin") == []
+        assert splitter.feed("ished. ") == ["Deploy finished."]
+
+    def test_punctuation_waits_for_whitespace(self):
+        """Test that a full stop at the end of a chunk is not yet a boundary."""
+        splitter = SentenceSplitter()
+
+        assert splitter.feed("Version 3.") == []
+        assert splitter.feed("14 released. ") == ["Version 3.14 released."]
+
+    def test_newline_is_a_boundary(self):
+        """Test that each line of tool output is its own sentence."""
+        splitter = SentenceSplitter()
+
+        assert splitter.feed("step one\nstep two\n") == ["step one", "step two"]
+
+    def test_closing_quote_stays_with_sentence(self):
+        """Test that closing quotes stay attached to their sentence."""
+        splitter = SentenceSplitter()
+
+        assert splitter.feed('He said "done." Next') == ['He said "done."']
+
+    def test_overlong_text_is_cut_at_space(self):
+        """Test that text without boundaries is cut so the buffer stays bounded."""
+        splitter = SentenceSplitter(max_chars=20)
+
+        sentences = splitter.feed("word " * 10)
+
+        assert sentences
+        assert all(len(sentence) <= 20 for sentence in sentences)
+        assert " ".join(sentences + splitter.flush()) == ("word " * 10).strip()
+
+    def test_flush_empty(self):
+        """Test flush with no pending text."""
+        assert SentenceSplitter().flush() == []
+
+
+class TestSpeakStream:
+    """Tests for speak_stream function."""
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_plays_sentences_in_order(self, mock_generate, mock_play):
+        """Test that each sentence is synthesized and played in input order."""
+        # Setup
+        mock_generate.side_effect = lambda text, config: Path(f"/cache/{text}.mp3")
+        stream = io.BytesIO(b"First one. Second one! Third")
+        config = {"api_key": "test"}
+
+        # Execute
+        spoken = await speak_stream(stream, config)
+
+        # Verify
+        assert spoken == 3
+        played = [call.args[0] for call in mock_play.call_args_list]
+        assert played == [
+            Path("/cache/First one..mp3"),
+            Path("/cache/Second one!.mp3"),
+            Path("/cache/Third.mp3"),
+        ]
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_multibyte_characters(self, mock_generate, mock_play):
+        """Test that UTF-8 characters split across reads are decoded intact."""
+        # Setup
+        stream = io.BytesIO("Café prêt. ".encode() * 2000)
+
+        # Execute
+        spoken = await speak_stream(stream, {"api_key": "test"})
+
+        # Verify
+        assert spoken == 2000
+        mock_generate.assert_any_call("Café prêt.", {"api_key": "test"})
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_empty_input(self, mock_generate, mock_play):
+        """Test that empty input speaks nothing."""
+        spoken = await speak_stream(io.BytesIO(b""), {"api_key": "test"})
+
+        assert spoken == 0
+        mock_generate.assert_not_called()
+        mock_play.assert_not_called()
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_synthesis_error(self, mock_generate, mock_play):
+        """Test that a synthesis error propagates to the caller."""
+        mock_generate.side_effect = Exception("API Error")
+
+        with pytest.raises(Exception) as exc_info:
+            await speak_stream(io.BytesIO(b"Hello. World. "), {"api_key": "test"})
+
+        assert "API Error" in str(exc_info.value)
+        mock_play.assert_not_called()
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_error_leaves_no_unretrieved_failures(self, mock_generate, mock_play):
+        """Test that failures of sentences never played are not reported as unretrieved."""
+        # Setup
+        mock_generate.side_effect = Exception("API Error")
+        loop = asyncio.get_running_loop()
+        reported = []
+        loop.set_exception_handler(lambda loop, context: reported.append(context))
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"One. Two. Three. Four. Five. Six. ")
+
+        # Execute
+        try:
+            with open(read_fd, "rb") as stream:
+                with pytest.raises(Exception, match="API Error"):
+                    await speak_stream(stream, {"api_key": "test"})
+                gc.collect()
+                await asyncio.sleep(0)
+        finally:
+            os.close(write_fd)
+            loop.set_exception_handler(None)
+
+        # Verify
+        assert reported == []
+        mock_play.assert_not_called()
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_reads_pipe(self, mock_generate, mock_play):
+        """Test that a stream with a file descriptor is read through it."""
+        # Setup
+        mock_generate.side_effect = lambda text, config: Path(f"/cache/{text}.mp3")
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"From a pipe. Done")
+        os.close(write_fd)
+
+        # Execute
+        with open(read_fd, "rb") as stream:
+            spoken = await speak_stream(stream, {"api_key": "test"})
+
+        # Verify
+        assert spoken == 2
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_holds_claim(self, mock_generate, mock_play):
+        """Test that playback holds a claim at the given priority and can be preempted."""
+        # Setup
+        mock_generate.side_effect = lambda text, config: Path(f"/cache/{text}.mp3")
+        seen = []
+        mock_play.side_effect = lambda *args, **kwargs: seen.append(active_priorities())
+
+        # Execute
+        await speak_stream(io.BytesIO(b"Hello there."), {"api_key": "test"}, priority=5)
+
+        # Verify
+        assert seen == [[5]]
+        assert active_priorities() == []
+        assert mock_play.call_args.kwargs["preempt_mode"] == "stop"
+        assert mock_play.call_args.kwargs["claim"] is not None
+
+    @patch('speaky.stream.play_audio_file')
+    @patch('speaky.stream.generate_and_cache_audio', new_callable=AsyncMock)
+    @pytest.mark.asyncio
+    async def test_speak_stream_waits_while_outranked(self, mock_generate, mock_play, monkeypatch):
+        """Test that the next sentence waits while a higher-priority message is playing."""
+        # Setup
+        monkeypatch.setattr(stream_module, "IDLE_POLL_INTERVAL", 0.01)
+        mock_generate.side_effect = lambda text, config: Path(f"/cache/{text}.mp3")
+        urgent = PlaybackClaim(10)
+        urgent.__enter__()
+
+        # Execute
+        task = asyncio.create_task(speak_stream(io.BytesIO(b"Hello there."), {"api_key": "test"}))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        mock_play.assert_not_called()
+        urgent.__exit__(None, None, None)
+
+        # Verify
+        assert await asyncio.wait_for(task, timeout=1) == 1
+        mock_play.assert_called_once()
@@ -0,0 +1,171 @@
+"""Tests for timescale module."""
+
+from unittest.mock import patch
+import wave
+
+import pytest
+
+from speaky.cache import get_cache_file
+from speaky.config import get_cache_dir
+from speaky.timescale import (
+    playback_speed, variant_file, wsola, time_compress_file, generate_time_compressed,
+)
+
+np = pytest.importorskip("numpy")
+
+SAMPLE_RATE = 24000
+CONFIG = {"voice": "nova", "instructions": "Be clear.", "response_format": "mp3"}
+
+
+def tone(frequency, seconds, sample_rate=SAMPLE_RATE):
+    """Return a mono sine tone as a (frames x 1) array."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (np.sin(2 * np.pi * frequency * t) * 10000)[:, None]
+
+
+def peak_frequency(samples, sample_rate=SAMPLE_RATE):
+    """Return the strongest frequency in mono ``samples``."""
+    spectrum = np.abs(np.fft.rfft(samples[:, 0] * np.hanning(len(samples))))
+    return np.argmax(spectrum) * sample_rate / len(samples)
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    """Write (frames x 1) samples as a 16-bit PCM WAV file."""
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples[:, 0].astype("<i2").tobytes())
+
+
+class TestPlaybackSpeed:
+    """Tests for playback_speed function."""
+
+    def test_default_speed(self):
+        """Test that the speed defaults to normal playback."""
+        assert playback_speed({}) == 1.0
+
+    def test_configured_speed(self):
+        """Test that a configured speed is returned as a float."""
+        assert playback_speed({"playback_speed": "1.3"}) == 1.3
+
+    @pytest.mark.parametrize("value", [0.25, 3, "fast", None])
+    def test_invalid_speed(self, value):
+        """Test that speeds out of range or not numbers are rejected."""
+        with pytest.raises(ValueError, match="playback_speed"):
+            playback_speed({"playback_speed": value})
+
+
+class TestWsola:
+    """Tests for wsola function."""
+
+    @pytest.mark.parametrize("speed", [0.5, 0.8, 1.3, 2.0])
+    def test_duration_scales(self, speed):
+        """Test that the output is shorter by the speed factor."""
+        # Setup
+        samples = tone(200, 1.0)
+
+        # Execute
+        result = wsola(samples, SAMPLE_RATE, speed)
+
+        # Verify
+        assert result.shape == (round(SAMPLE_RATE / speed), 1)
+
+    def test_pitch_preserved(self):
+        """Test that compressing a tone keeps its frequency."""
+        # Setup
+        samples = tone(180, 2.0)
+
+        # Execute
+        result = wsola(samples, SAMPLE_RATE, 1.5)
+
+        # Verify
+        assert abs(peak_frequency(result) - 180) < 2
+
+    def test_normal_speed_is_identity(self):
+        """Test that a speed of one reproduces the input."""
+        # Setup
+        samples = tone(200, 0.5)
+
+        # Execute
+        result = wsola(samples, SAMPLE_RATE, 1.0)
+
+        # Verify
+        assert np.allclose(result, samples)
+
+
+class TestTimeCompressFile:
+    """Tests for time_compress_file function."""
+
+    def test_writes_shorter_wav(self, tmp_path):
+        """Test that the compressed file is a shorter WAV with the same format."""
+        # Setup
+        source = tmp_path / "source.wav"
+        target = tmp_path / "target.wav"
+        write_wav(source, tone(220, 1.0))
+
+        # Execute
+        time_compress_file(source, target, 1.25)
+
+        # Verify
+        with wave.open(str(target), "rb") as f:
+            assert f.getframerate() == SAMPLE_RATE
+            assert f.getnchannels() == 1
+            assert f.getnframes() == round(SAMPLE_RATE / 1.25)
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == ".part"] == []
+
+    def test_rejects_non_pcm(self, tmp_path):
+        """Test that audio other than 16-bit PCM is refused."""
+        # Setup
+        source = tmp_path / "source.wav"
+        with wave.open(str(source), "wb") as f:
+            f.setnchannels(1)
+            f.setsampwidth(1)
+            f.setframerate(SAMPLE_RATE)
+            f.writeframes(bytes(100))
+
+        # Execute & Verify
+        with pytest.raises(ValueError, match="16-bit PCM"):
+            time_compress_file(source, tmp_path / "target.wav", 1.5)
+
+
+class TestGenerateTimeCompressed:
+    """Tests for generate_time_compressed function."""
+
+    @pytest.mark.asyncio
+    async def test_creates_variant_from_wav(self):
+        """Test that a miss synthesizes WAV and stores the compressed variant."""
+        # Setup
+        source = get_cache_file("hello", "nova", "Be clear.", "wav", exact=True)
+
+        async def fake_generate(text, config, client=None, exact_format=False, lane="interactive"):
+            assert config["response_format"] == "wav"
+            assert exact_format is True
+            write_wav(source, tone(200, 0.5))
+            return source
+
+        # Execute
+        with patch('speaky.timescale.generate_and_cache_audio', side_effect=fake_generate):
+            result = await generate_time_compressed("hello", CONFIG, 1.5)
+
+        # Verify
+        assert result == variant_file(source, 1.5)
+        assert result.name.endswith(".x1.50.wav")
+        assert result.exists()
+
+    @pytest.mark.asyncio
+    async def test_reuses_existing_variant(self):
+        """Test that an existing variant is returned without synthesis."""
+        # Setup
+        source = get_cache_file("hello", "nova", "Be clear.", "wav", exact=True)
+        variant = variant_file(source, 1.5)
+        variant.write_bytes(b"compressed")
+
+        # Execute
+        with patch('speaky.timescale.generate_and_cache_audio') as mock_generate:
+            result = await generate_time_compressed("hello", CONFIG, 1.5)
+
+        # Verify
+        assert result == variant
+        mock_generate.assert_not_called()
+        assert variant.parent == get_cache_dir()
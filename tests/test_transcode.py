@@ -0,0 +1,242 @@
+"""Tests for transcode module."""
+
+from pathlib import Path
+from unittest.mock import patch
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from speaky.cache import get_cache_file
+from speaky.config import get_cache_dir
+from speaky.history import record_phrase
+from speaky.segments import render_document
+from speaky.transcode import (
+    transcode_to_opus, pending_entries, compact_cache, LOCK_FILE_NAME, LOCK_TIMEOUT,
+)
+
+CONFIG = {
+    "api_key": "test-key",
+    "model": "gpt-4o-mini-tts",
+    "voice": "nova",
+    "instructions": "test instructions",
+    "response_format": "mp3",
+}
+
+
+def fake_ffmpeg(args, **kwargs):
+    """Stand in for ffmpeg by writing a marker to the output path."""
+    with open(args[-1], "wb") as f:
+        f.write(b"opus audio")
+    return subprocess.CompletedProcess(args, 0)
+
+
+def spoken(text):
+    """Record ``text`` as spoken and write its MP3 cache entry."""
+    record_phrase(text)
+    mp3_file = get_cache_file(text, CONFIG["voice"], CONFIG["instructions"], "mp3", exact=True)
+    mp3_file.write_bytes(b"mp3 audio")
+    return mp3_file
+
+
+class TestTranscodeToOpus:
+    """Tests for transcode_to_opus function."""
+
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_replaces_mp3_with_opus(self, mock_run):
+        """Test that the Opus entry replaces the MP3 entry."""
+        # Setup
+        mp3_file = get_cache_dir() / "abc.mp3"
+        mp3_file.write_bytes(b"mp3 audio")
+
+        # Execute
+        result = transcode_to_opus(mp3_file, "24k")
+
+        # Verify
+        assert result == mp3_file.with_suffix(".opus")
+        assert result.read_bytes() == b"opus audio"
+        assert not mp3_file.exists()
+        args = mock_run.call_args[0][0]
+        assert args[args.index("-b:a") + 1] == "24k"
+        assert args[args.index("-c:a") + 1] == "libopus"
+
+    @patch('speaky.transcode.subprocess.run')
+    def test_failure_keeps_mp3(self, mock_run):
+        """Test that a failed transcode leaves the MP3 entry and no part file."""
+        # Setup
+        mock_run.side_effect = subprocess.CalledProcessError(1, "ffmpeg")
+        mp3_file = get_cache_dir() / "abc.mp3"
+        mp3_file.write_bytes(b"mp3 audio")
+
+        # Execute
+        try:
+            transcode_to_opus(mp3_file, "24k")
+        except subprocess.CalledProcessError:
+            pass
+
+        # Verify
+        assert mp3_file.exists()
+        assert sorted(p.name for p in get_cache_dir().iterdir()) == ["abc.mp3"]
+
+
+class TestPendingEntries:
+    """Tests for pending_entries function."""
+
+    def test_skips_and_removes_compacted_entries(self):
+        """Test that MP3 entries with an Opus sibling are not pending."""
+        # Setup
+        new = spoken("new")
+        old = spoken("old")
+        old.with_suffix(".opus").touch()
+
+        # Execute
+        pending = pending_entries(CONFIG)
+
+        # Verify
+        assert pending == [new]
+        assert not old.exists()
+
+    def test_only_spoken_phrases_pending(self):
+        """Test that entries not in the phrase history, such as rendered parts, are left alone."""
+        # Setup
+        phrase = spoken("spoken")
+        rendered = get_cache_file("rendered", "nova", "test instructions", "mp3", exact=True)
+        rendered.touch()
+
+        # Execute
+        pending = pending_entries(CONFIG)
+
+        # Verify
+        assert pending == [phrase]
+
+
+class TestCompactCache:
+    """Tests for compact_cache function."""
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_compacts_pending_entries(self, mock_run, mock_which, capsys):
+        """Test that every pending entry is transcoded at the configured bitrate."""
+        # Setup
+        entries = [spoken(text) for text in ("a", "b", "c")]
+
+        # Execute
+        count = compact_cache({**CONFIG, "storage_bitrate": "16k"})
+
+        # Verify
+        assert count == 3
+        for mp3_file in entries:
+            assert not mp3_file.exists()
+            assert mp3_file.with_suffix(".opus").exists()
+        for call in mock_run.call_args_list:
+            assert "16k" in call[0][0]
+        assert "✅ Compacted 3 cache entries" in capsys.readouterr().out
+
+    @patch('speaky.transcode.shutil.which', return_value=None)
+    def test_without_ffmpeg(self, mock_which, capsys):
+        """Test that compaction is skipped when ffmpeg is not installed."""
+        spoken("a")
+
+        assert compact_cache(CONFIG) == 0
+        assert "ffmpeg not found" in capsys.readouterr().out
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_skips_when_already_running(self, mock_run, mock_which):
+        """Test that a second compaction exits while one holds the lock."""
+        # Setup
+        cache_dir = get_cache_dir()
+        entry = spoken("a")
+        (cache_dir / LOCK_FILE_NAME).touch()
+
+        # Execute
+        count = compact_cache(CONFIG)
+
+        # Verify
+        assert count == 0
+        mock_run.assert_not_called()
+        assert entry.exists()
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_lock_of_dead_process_is_taken_over(self, mock_run, mock_which):
+        """Test that a lock left by a killed compaction does not disable compaction."""
+        # Setup
+        cache_dir = get_cache_dir()
+        entry = spoken("a")
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        (cache_dir / LOCK_FILE_NAME).write_text(str(dead.pid))
+
+        # Execute
+        count = compact_cache(CONFIG)
+
+        # Verify
+        assert count == 1
+        assert not (cache_dir / LOCK_FILE_NAME).exists()
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_lock_not_refreshed_is_taken_over(self, mock_run, mock_which):
+        """Test that a lock older than LOCK_TIMEOUT is taken over even if its PID exists."""
+        # Setup
+        cache_dir = get_cache_dir()
+        entry = spoken("a")
+        lock_file = cache_dir / LOCK_FILE_NAME
+        lock_file.write_text(str(os.getpid()))
+        old = time.time() - LOCK_TIMEOUT - 1
+        os.utime(lock_file, (old, old))
+
+        # Execute
+        count = compact_cache(CONFIG)
+
+        # Verify
+        assert count == 1
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    def test_live_lock_is_respected(self, mock_run, mock_which):
+        """Test that a fresh lock held by a live process is left alone."""
+        # Setup
+        cache_dir = get_cache_dir()
+        entry = spoken("a")
+        (cache_dir / LOCK_FILE_NAME).write_text(str(os.getpid()))
+
+        # Execute
+        count = compact_cache(CONFIG)
+
+        # Verify
+        assert count == 0
+        assert (cache_dir / LOCK_FILE_NAME).exists()
+
+    @patch('speaky.transcode.shutil.which', return_value="/usr/bin/ffmpeg")
+    @patch('speaky.transcode.subprocess.run', side_effect=fake_ffmpeg)
+    @pytest.mark.asyncio
+    async def test_rendered_segments_survive_compaction(self, mock_run, mock_which, tmp_path):
+        """Test that a document rendered before a compaction is re-rendered from the cache."""
+        # Setup
+        synthesized = []
+
+        async def fake_stream_speech(text, config, client=None):
+            synthesized.append(text)
+            yield b"\xff\xfb\x90\x00" + bytes(413)
+
+        document = " ".join(f"Step {i} runs as before." for i in range(12))
+        output = tmp_path / "notes.mp3"
+        phrase = spoken("Build finished")
+
+        with patch('speaky.tts.stream_speech', side_effect=fake_stream_speech):
+            first, total = await render_document(document, CONFIG, output)
+
+            # Execute
+            compact_cache(CONFIG)
+            synthesized.clear()
+            again, _ = await render_document(document, CONFIG, output)
+
+        # Verify
+        assert first == total
+        assert again == 0
+        assert synthesized == []
+        assert phrase.with_suffix(".opus").exists()
@@ -1,12 +1,21 @@
 """Tests for TTS module."""
 
+import asyncio
 import tempfile
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
 from unittest.mock import AsyncMock
 from contextlib import asynccontextmanager
 
+import openai
+
+from speaky import breaker, priority
+from speaky.breaker import CircuitOpenError, record_failure
+from speaky.config import get_cache_dir
+from speaky.priority import PlaybackClaim, get_claims_dir
+from speaky.scheduler import SynthesisScheduler, BACKGROUND
 from speaky.tts import generate_and_cache_audio
 
 
@@ -37,7 +46,7 @@ class TestGenerateAndCacheAudio:
             # Verify
             assert result == cache_file
             mock_get_cache_file.assert_called_once_with(
-                "test text", "nova", "test instructions"
+                "test text", "nova", "test instructions", "mp3", exact=False
             )
     
     @patch('speaky.tts.AsyncOpenAI')
@@ -93,6 +102,51 @@ class TestGenerateAndCacheAudio:
                 content = f.read()
             assert content == b'audiodatachunks'
     
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_generate_and_cache_audio_on_chunk(self, mock_get_cache_file, mock_openai_class):
+        """Test chunks are reported as written and no partial file is left behind."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "new.mp3"
+            mock_get_cache_file.return_value = cache_file
+            
+            mock_client = AsyncMock()
+            mock_openai_class.return_value = mock_client
+            mock_response = AsyncMock()
+            
+            async def mock_async_iter():
+                for chunk in [b'audio', b'data']:
+                    # The entry must not appear until it is complete
+                    assert not cache_file.exists()
+                    yield chunk
+            
+            mock_response.iter_bytes = mock_async_iter
+            
+            @asynccontextmanager
+            async def mock_context_manager(*args, **kwargs):
+                yield mock_response
+            
+            mock_client.audio.speech.with_streaming_response.create = mock_context_manager
+            
+            config = {
+                "api_key": "test-key",
+                "model": "gpt-4o-mini-tts",
+                "voice": "nova",
+                "instructions": "test instructions",
+                "response_format": "mp3"
+            }
+            chunks = []
+            
+            # Execute
+            await generate_and_cache_audio("test text", config, on_chunk=chunks.append)
+            
+            # Verify
+            assert chunks == [b'audio', b'data']
+            assert cache_file.read_bytes() == b'audiodata'
+            assert list(Path(temp_dir).iterdir()) == [cache_file]
+    
     @patch('speaky.tts.AsyncOpenAI')
     @patch('speaky.tts.get_cache_file')
     @pytest.mark.asyncio
@@ -188,5 +242,204 @@ class TestGenerateAndCacheAudio:
             
             # Verify parameters passed correctly
             mock_get_cache_file.assert_called_once_with(
-                "custom text", "alloy", "custom instructions"
-            )
\ No newline at end of file
+                "custom text", "alloy", "custom instructions", "mp3", exact=False
+            )
+
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_generate_and_cache_audio_outage_opens_circuit(self, mock_get_cache_file, mock_openai_class):
+        """Test repeated connection failures make later misses fail fast."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mock_get_cache_file.return_value = Path(temp_dir) / "outage.mp3"
+            
+            mock_client = AsyncMock()
+            mock_openai_class.return_value = mock_client
+            
+            @asynccontextmanager
+            async def mock_context_manager(*args, **kwargs):
+                raise openai.APIConnectionError(request=MagicMock())
+                yield  # This won't be reached
+            
+            mock_client.audio.speech.with_streaming_response.create = mock_context_manager
+            
+            config = {
+                "api_key": "test-key",
+                "model": "gpt-4o-mini-tts",
+                "voice": "nova",
+                "instructions": "test instructions",
+                "response_format": "mp3",
+                "breaker_threshold": 2,
+            }
+            
+            # Execute
+            for _ in range(2):
+                with pytest.raises(openai.APIConnectionError):
+                    await generate_and_cache_audio("test text", config)
+            mock_openai_class.reset_mock()
+            
+            # Verify
+            with pytest.raises(CircuitOpenError):
+                await generate_and_cache_audio("test text", config)
+            mock_openai_class.assert_not_called()
+    
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_generate_and_cache_audio_probe_released_on_other_error(self, mock_get_cache_file, mock_openai_class):
+        """Test a probe that fails with a non-outage error lets the next process probe."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mock_get_cache_file.return_value = Path(temp_dir) / "probe.mp3"
+            mock_client = AsyncMock()
+            mock_openai_class.return_value = mock_client
+            
+            @asynccontextmanager
+            async def mock_context_manager(*args, **kwargs):
+                raise ValueError("Invalid request")
+                yield  # This won't be reached
+            
+            mock_client.audio.speech.with_streaming_response.create = mock_context_manager
+            config = {
+                "api_key": "test-key",
+                "model": "gpt-4o-mini-tts",
+                "voice": "nova",
+                "instructions": "test instructions",
+                "response_format": "mp3",
+                "breaker_threshold": 1,
+            }
+            breaker._save_state({"failures": 1, "opened_at": time.time() - 120})
+            
+            # Execute
+            with pytest.raises(ValueError):
+                await generate_and_cache_audio("test text", config)
+            
+            # Verify
+            assert not (get_cache_dir() / breaker.PROBE_FILE_NAME).exists()
+            assert breaker.before_request(config) is True
+    
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_generate_and_cache_audio_hit_ignores_open_circuit(self, mock_get_cache_file, mock_openai_class):
+        """Test cache hits keep working while the circuit is open."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "cached.mp3"
+            cache_file.touch()
+            mock_get_cache_file.return_value = cache_file
+            config = {"voice": "nova", "instructions": "test", "breaker_threshold": 1}
+            record_failure(config)
+            
+            result = await generate_and_cache_audio("test text", config)
+            
+            assert result == cache_file
+    
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_generate_and_cache_audio_waits_for_lane(self, mock_get_cache_file, mock_openai_class):
+        """Test a miss waits for a scheduler slot and rechecks the cache once admitted."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "new.mp3"
+            mock_get_cache_file.return_value = cache_file
+            scheduler = SynthesisScheduler(limit=1, reserve=0)
+            config = {"voice": "nova", "instructions": "test"}
+            
+            with patch('speaky.tts.scheduler', scheduler):
+                async with scheduler.slot(BACKGROUND):
+                    task = asyncio.create_task(
+                        generate_and_cache_audio("test text", config, lane=BACKGROUND)
+                    )
+                    await asyncio.sleep(0)
+                    
+                    # Verify: queued behind the held slot
+                    assert scheduler.waiting(BACKGROUND) == 1
+                    cache_file.write_bytes(b"written meanwhile")
+                
+                # Execute
+                result = await task
+            
+            # Verify
+            assert result == cache_file
+            mock_openai_class.assert_not_called()
+
+    
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_background_miss_waits_for_other_process(self, mock_get_cache_file, mock_openai_class,
+                                                           monkeypatch):
+        """Test a background miss holds its request while another process is speaking."""
+        # Setup
+        monkeypatch.setattr(priority, "IDLE_POLL_INTERVAL", 0.01)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "new.mp3"
+            mock_get_cache_file.return_value = cache_file
+            mock_client = MagicMock()
+            mock_openai_class.return_value = mock_client
+            
+            @asynccontextmanager
+            async def mock_context_manager(*args, **kwargs):
+                mock_response = MagicMock()
+                async def chunks():
+                    yield b"audio"
+                mock_response.iter_bytes = chunks
+                yield mock_response
+            
+            mock_client.audio.speech.with_streaming_response.create = mock_context_manager
+            config = {"api_key": "test-key", "model": "gpt-4o-mini-tts", "voice": "nova",
+                      "instructions": "test", "response_format": "mp3"}
+            # A claim written by another speaky process
+            other_claim = get_claims_dir() / "99999-other.claim"
+            other_claim.write_text("0")
+            
+            # Execute
+            task = asyncio.create_task(
+                generate_and_cache_audio("test text", config, lane=BACKGROUND)
+            )
+            await asyncio.sleep(0.05)
+            
+            # Verify: no request while the claim is held
+            assert not task.done()
+            mock_openai_class.assert_not_called()
+            
+            other_claim.unlink()
+            result = await asyncio.wait_for(task, timeout=1)
+            assert result == cache_file
+            assert cache_file.read_bytes() == b"audio"
+    
+    @patch('speaky.tts.AsyncOpenAI')
+    @patch('speaky.tts.get_cache_file')
+    @pytest.mark.asyncio
+    async def test_interactive_miss_ignores_claims(self, mock_get_cache_file, mock_openai_class):
+        """Test an interactive miss is requested straight away while a claim is held."""
+        # Setup
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_file = Path(temp_dir) / "new.mp3"
+            mock_get_cache_file.return_value = cache_file
+            mock_client = MagicMock()
+            mock_openai_class.return_value = mock_client
+            
+            @asynccontextmanager
+            async def mock_context_manager(*args, **kwargs):
+                mock_response = MagicMock()
+                async def chunks():
+                    yield b"audio"
+                mock_response.iter_bytes = chunks
+                yield mock_response
+            
+            mock_client.audio.speech.with_streaming_response.create = mock_context_manager
+            config = {"api_key": "test-key", "model": "gpt-4o-mini-tts", "voice": "nova",
+                      "instructions": "test", "response_format": "mp3"}
+            
+            # Execute
+            with PlaybackClaim():
+                result = await asyncio.wait_for(
+                    generate_and_cache_audio("test text", config), timeout=1
+                )
+            
+            # Verify
+            assert result == cache_file
+